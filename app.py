@@ -6,7 +6,9 @@ import os
 
 # Import utility functions
 from utils.data_loader import load_las_file, load_production_data, load_drilling_data, get_sample_data_path
+from utils.prewarm import start_prewarm_watcher
 from utils.visualization import create_kpi_card
+from utils.figure_encoding import compact_figure
 from utils.session_state import initialize_session_state
 from utils.style_manager import load_css, apply_theme, display_header_image
 
@@ -30,6 +32,9 @@ st.set_page_config(
 # Initialize session state
 initialize_session_state()
 
+# Prebuild new and changed files in the data directory before anyone opens them
+start_prewarm_watcher()
+
 # Main title
 #st.title(" ")
 
@@ -108,7 +113,7 @@ with tab1:
             st.subheader("Gamma Ray Distribution")
             fig = px.histogram(st.session_state.well_log_data, x='GR', nbins=30,
                               title="Gamma Ray Distribution")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
     else:
         st.info("No well log data available. Please upload data on the Well Log Analysis page.")
 
@@ -131,7 +136,7 @@ with tab2:
             st.subheader("Monthly Oil Production")
             fig = px.line(monthly_production, x='Date', y='Oil_Production_bbl',
                          title="Monthly Oil Production")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
     else:
         st.info("No production data available. Please upload data on the Production Analysis page.")
 
@@ -145,7 +150,7 @@ with tab3:
             fig = px.scatter(st.session_state.drilling_data, x='ROP', y='Depth',
                             title="ROP vs Depth")
             fig.update_yaxes(autorange="reversed")  # Depth increases downward
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
     else:
         st.info("No drilling data available. Please upload data on the Drilling KPI page.")
 
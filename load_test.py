@@ -0,0 +1,291 @@
+"""Headless load test for the dashboard pages.
+
+Simulates concurrent user sessions with Streamlit's AppTest, driving the
+app and each page through their widgets against synthetic datasets, and
+reports rerun latency percentiles, CPU use and peak RSS per session count.
+
+    python load_test.py --sessions 1 2 4 8 --iterations 3
+
+Each session count runs in a fresh process so peak RSS and caches are not
+carried over between levels. AppTest comes with the pinned streamlit.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Same as utils.data_loader.DATA_DIR_ENV; not imported so streamlit stays out of the parent
+DATA_DIR_ENV = 'OG_DASHBOARD_DATA_DIR'
+
+PAGES = {
+    'app': 'app.py',
+    'well_log': os.path.join('pages', '1_Well_Log_Analysis.py'),
+    'production': os.path.join('pages', '2_Production_Analysis.py'),
+    'drilling': os.path.join('pages', '3_Drilling_KPIs.py'),
+}
+
+# Default synthetic dataset sizes, roughly a mid-size field
+DEFAULT_SCALE = {
+    'wells': 500,
+    'days': 1095,
+    'drilling_rows': 500_000,
+    'las_samples': 40_000,
+    'las_wells': 4,
+}
+
+def write_synthetic_production(path, n_wells, n_days, rng):
+    """Write daily oil/gas/water production for n_wells declining wells."""
+    dates = pd.date_range('2020-01-01', periods=n_days, freq='D')
+    days = np.arange(n_days)
+    qi = rng.uniform(200, 2000, n_wells)[:, None]
+    decline = rng.uniform(2e-4, 3e-3, n_wells)[:, None]
+    oil = qi * np.exp(-decline * days) * rng.lognormal(0, 0.08, (n_wells, n_days))
+
+    df = pd.DataFrame({
+        'Date': np.tile(dates, n_wells),
+        'Well_ID': np.repeat([f"Well_{i:04d}" for i in range(n_wells)], n_days),
+        'Oil_Production_bbl': oil.ravel().round(2),
+        'Gas_Production_mcf': (oil * rng.uniform(2.5, 4.0, (n_wells, 1))).ravel().round(2),
+        'Water_Production_bbl': (oil * (0.1 + days / n_days)).ravel().round(2),
+    })
+    df.to_csv(path, index=False)
+
+def write_synthetic_drilling(path, n_rows, rng):
+    """Write a drilling record with the columns of data/drilling_data.csv."""
+    depth = 1000 + np.arange(n_rows) * 0.5
+    hardness = 0.6 + np.cumsum(rng.normal(0, 0.01, n_rows)).clip(-0.5, 2.0)
+    wob = rng.uniform(60, 200, n_rows)
+    rpm = rng.uniform(60, 170, n_rows)
+    rop = (50 / (1 + hardness) * rng.lognormal(0, 0.1, n_rows)).clip(1, 50)
+    torque = (1 + 0.01 * wob * hardness * rng.lognormal(0, 0.1, n_rows)).round(4)
+    minutes = np.cumsum(60 * 0.5 / rop)
+
+    df = pd.DataFrame({
+        'Timestamp': (pd.Timestamp('2023-01-01') + pd.to_timedelta(minutes, unit='min')).strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'Depth': depth,
+        'ROP': rop,
+        'WOB': wob,
+        'RPM': rpm,
+        'Torque': torque,
+        'MSE': wob * 1e4 + 2 * np.pi * rpm * torque * 1e4 / rop,
+        'Formation_Hardness': hardness,
+    })
+    df.to_csv(path, index=False)
+
+def write_synthetic_las(path, n_samples, start_depth, rng):
+    """Write a LAS 2.0 file with GR, RT, RHOB, NPHI and DT curves."""
+    step = 0.5
+    depth = start_depth + np.arange(n_samples) * step
+    shale = (np.sin(depth / 37.0) + rng.normal(0, 0.2, n_samples) > 0.3).astype(float)
+    curves = np.column_stack([
+        depth,
+        40 + 60 * shale + rng.normal(0, 4, n_samples),
+        np.exp(1.5 - shale + rng.normal(0, 0.2, n_samples)),
+        2.35 + 0.2 * shale + rng.normal(0, 0.02, n_samples),
+        0.2 + 0.1 * shale + rng.normal(0, 0.01, n_samples),
+        75 + 15 * shale + rng.normal(0, 2, n_samples),
+    ])
+
+    header = "\n".join([
+        "~Version ---------------------------------------------------",
+        "VERS.   2.0 : CWLS log ASCII Standard -VERSION 2.0",
+        "WRAP.    NO : One line per depth step",
+        "~Well ------------------------------------------------------",
+        f"STRT.M {depth[0]:12.5f} : Start depth",
+        f"STOP.M {depth[-1]:12.5f} : Stop depth",
+        f"STEP.M {step:12.5f} : Step",
+        "NULL.          -999.25 : Null value",
+        f"WELL.     LOADTEST-{int(start_depth)} : Well name",
+        "~Curve Information -----------------------------------------",
+        "DEPTH.M     : Depth",
+        "GR   .API   : Gamma Ray",
+        "RT   .OHMM  : Resistivity",
+        "RHOB .G/C3  : Bulk Density",
+        "NPHI .V/V   : Neutron Porosity",
+        "DT   .US/F  : Sonic Travel Time",
+        "~ASCII -----------------------------------------------------",
+    ])
+    np.savetxt(path, curves, fmt='%11.5f', header=header, comments='')
+
+def write_synthetic_data(data_dir, scale, seed=0):
+    """Write the synthetic datasets under the sample file names the pages load."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    write_synthetic_production(os.path.join(data_dir, 'production_data.csv'), scale['wells'], scale['days'], rng)
+    write_synthetic_drilling(os.path.join(data_dir, 'drilling_data.csv'), scale['drilling_rows'], rng)
+    write_synthetic_las(os.path.join(data_dir, 'synthetic_well.las'), scale['las_samples'], 1000.0, rng)
+    for i in range(1, scale['las_wells']):
+        write_synthetic_las(os.path.join(data_dir, f'offset_well_{i}.las'), scale['las_samples'], 1000.0 + 50 * i, rng)
+
+def _widget(at, kind, label):
+    """Find a widget of the given kind by its label."""
+    for widget in getattr(at, kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+def _narrow(widget, fraction):
+    """Set a range slider to its lower `fraction` of the current range."""
+    low, high = widget.value
+    return widget.set_value((low, low + (high - low) * fraction))
+
+# Each step names a page and a widget interaction applied before a rerun
+SCENARIO = [
+    ('app', None),
+    ('well_log', None),
+    ('well_log', lambda at: _narrow(_widget(at, 'slider', "Depth Range"), 0.25)),
+    ('well_log', lambda at: _widget(at, 'checkbox', "Compute Petrophysical Curves").check()),
+    ('production', None),
+    ('production', lambda at: _widget(at, 'selectbox', "Select Resampling Frequency").set_value("Weekly")),
+    ('production', lambda at: _widget(at, 'selectbox', "Select Resampling Frequency").set_value("Monthly")),
+    ('production', lambda at: _widget(at, 'slider', "Moving Average Window Size").set_value(6)),
+    ('production', lambda at: _widget(at, 'checkbox', "Show Decline Curve Analysis").check()),
+    ('production', lambda at: _widget(at, 'checkbox', "Show Decline Curve Analysis").uncheck()),
+    ('drilling', None),
+    ('drilling', lambda at: _narrow(_widget(at, 'slider', "Depth Range (m)"), 0.1)),
+    ('drilling', lambda at: _widget(at, 'selectbox', "Select Plot Type").set_value("Time-Based")),
+    ('drilling', lambda at: _widget(at, 'checkbox', "Detect Drilling Events").check()),
+]
+
+def run_session(iterations, timeout):
+    """Drive one simulated user through the scenario; return (step, seconds, error) records."""
+    from streamlit.testing.v1 import AppTest
+
+    apps = {}
+    records = []
+    for _ in range(iterations):
+        for page, action in SCENARIO:
+            if page not in apps or action is None:
+                apps[page] = AppTest.from_file(os.path.join(ROOT_DIR, PAGES[page]), default_timeout=timeout)
+            at = apps[page]
+
+            start = time.perf_counter()
+            error = None
+            try:
+                if action is not None:
+                    action(at)
+                at.run()
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as e:
+                error = str(e)
+            records.append((page, time.perf_counter() - start, error))
+    return records
+
+def run_level(n_sessions, iterations, data_dir, timeout, warmup):
+    """Run n_sessions concurrent sessions in this process and summarize them."""
+    os.chdir(ROOT_DIR)
+    os.environ[DATA_DIR_ENV] = data_dir
+
+    # Deprecation notices from every rerun would bury the report
+    logging.disable(logging.WARNING)
+
+    if warmup:
+        run_session(1, timeout)
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        results = list(pool.map(lambda _: run_session(iterations, timeout), range(n_sessions)))
+    wall = time.perf_counter() - wall_start
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+    records = [record for session in results for record in session]
+    latencies = np.array([seconds for _, seconds, _ in records])
+    errors = sorted({f"{page}: {error}" for page, _, error in records if error})
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+
+    per_page = {
+        page: float(np.percentile([s for p, s, _ in records if p == page], 95))
+        for page in PAGES
+    }
+
+    return {
+        'sessions': n_sessions,
+        'reruns': len(records),
+        'wall_s': wall,
+        'reruns_per_s': len(records) / wall,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p90_ms': float(np.percentile(latencies, 90) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'max_ms': float(latencies.max() * 1000),
+        'page_p95_ms': {page: value * 1000 for page, value in per_page.items()},
+        'cpu_cores': cpu / wall,
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': usage_end.ru_maxrss / 1024,
+        'errors': errors,
+    }
+
+def format_report(results):
+    """Format level summaries as a fixed-width table."""
+    lines = [f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+             f"{'p99 ms':>8} {'max ms':>8} {'cpu':>6} {'rss MB':>8}"]
+    for r in results:
+        lines.append(f"{r['sessions']:>8} {r['reruns']:>7} {r['reruns_per_s']:>8.1f} {r['p50_ms']:>8.0f} "
+                     f"{r['p90_ms']:>8.0f} {r['p99_ms']:>8.0f} {r['max_ms']:>8.0f} {r['cpu_cores']:>6.2f} "
+                     f"{r['peak_rss_mb']:>8.0f}")
+        for error in r['errors']:
+            lines.append(f"{'':>8} error: {error}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="concurrent session counts to test")
+    parser.add_argument('--iterations', type=int, default=2, help="scenario passes per session")
+    parser.add_argument('--data-dir', help="directory for the synthetic data (kept if given)")
+    parser.add_argument('--reuse-data', action='store_true', help="reuse existing files in --data-dir")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds allowed per rerun")
+    parser.add_argument('--no-warmup', action='store_true', help="include cold caches in the timings")
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    for name, value in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value,
+                            help=f"synthetic dataset size (default {value})")
+    args = parser.parse_args()
+
+    scale = {name: getattr(args, name) for name in DEFAULT_SCALE}
+    temp_dir = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix='og_load_test_')
+        data_dir = temp_dir.name
+
+    try:
+        if not args.reuse_data:
+            print(f"Writing synthetic data to {data_dir} ...")
+            write_synthetic_data(data_dir, scale)
+
+        results = []
+        for n_sessions in args.sessions:
+            # A fresh process per level keeps caches and peak RSS independent. Fork
+            # is enough for that, since the parent never imports streamlit, and it
+            # skips re-importing numpy and pandas in every level.
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_level, n_sessions, args.iterations, data_dir,
+                                     args.timeout, not args.no_warmup).result()
+            results.append(result)
+            print(format_report([result]).splitlines()[-1 - len(result['errors'])])
+
+        print()
+        print(format_report(results))
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'scale': scale, 'results': results}, f, indent=2)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,19 @@ from io import StringIO
 import os
 
 # Import utility functions
-from utils.data_loader import load_las_file, get_sample_data_path
-from utils.visualization import plot_well_log, plot_multi_well_log
-from utils.session_state import initialize_session_state, set_well_log_data
+from utils.data_loader import load_las_file, get_sample_well_log_paths, COMPRESSED_EXTENSIONS
+from utils.prewarm import select_sample_dataset
+from utils.dataset_registry import file_version
+from utils.visualization import plot_well_log, plot_multi_well_log, plot_multi_well_tracks
+from utils.figure_encoding import compact_figure, payload_expander
+from utils.curve_storage import footprint_report
+from utils.zones import read_tops, clean_tops, build_zone_index, zonal_summary, zone_samples
+from utils.session_state import initialize_session_state, set_well_log_data, set_multi_well_data, get_dataset_version
+from utils.regridding import common_curves, build_depth_grid, regrid_wells
+from utils.data_processing import filter_depth_range
+from utils.export import export_download, iter_frame_chunks
+from utils.petrophysics import PETRO_DEFAULTS, VSH_METHODS, add_petrophysics_curves, compute_petrophysics
+from utils.expressions import derived_column_controls, add_derived_columns
 from utils.style_manager import load_css, apply_theme, display_header_image
 
 apply_theme(theme="light")  # or "dark"
@@ -40,30 +50,60 @@ st.sidebar.header("Data Loading")
 
 # Option to use sample data or upload own data
 data_source = st.sidebar.radio("Select Data Source", ["Use Sample Data", "Upload LAS File"])
+well_name = "Current Well"
 
 if data_source == "Use Sample Data":
-    sample_path = get_sample_data_path('well_log')
+    sample_path = select_sample_dataset('well_log')
     if sample_path and os.path.exists(sample_path):
         las, df = load_las_file(sample_path)
         if df is not None:
-            set_well_log_data(df)
+            set_well_log_data(df, source=(sample_path, file_version(sample_path)))
+            well_name = os.path.basename(sample_path)
             st.sidebar.success("Sample data loaded successfully!")
     else:
         st.sidebar.error("Sample data not found. Please upload your own data.")
         data_source = "Upload LAS File"
 
 if data_source == "Upload LAS File":
-    uploaded_file = st.sidebar.file_uploader("Choose a LAS file", type="las")
+    uploaded_file = st.sidebar.file_uploader("Choose a LAS file", type=["las"] + COMPRESSED_EXTENSIONS)
     if uploaded_file is not None:
         las, df = load_las_file(uploaded_file)
         if df is not None:
-            set_well_log_data(df)
+            set_well_log_data(df, source=uploaded_file.id)
+            well_name = uploaded_file.name
             st.sidebar.success("File uploaded successfully!")
 
+# Sidebar for petrophysical interpretation parameters
+st.sidebar.header("Petrophysics")
+compute_petro = st.sidebar.checkbox("Compute Petrophysical Curves")
+petro_params = dict(PETRO_DEFAULTS)
+
+if compute_petro:
+    with st.sidebar.expander("Interpretation Parameters"):
+        petro_params['vsh_method'] = st.selectbox("Vshale Method", VSH_METHODS)
+        petro_params['rho_matrix'] = st.number_input("Matrix Density (g/cc)", value=PETRO_DEFAULTS['rho_matrix'])
+        petro_params['rho_fluid'] = st.number_input("Fluid Density (g/cc)", value=PETRO_DEFAULTS['rho_fluid'])
+        petro_params['rw'] = st.number_input("Rw (ohm.m)", value=PETRO_DEFAULTS['rw'], format="%.3f")
+        petro_params['archie_a'] = st.number_input("Archie a", value=PETRO_DEFAULTS['archie_a'])
+        petro_params['archie_m'] = st.number_input("Archie m", value=PETRO_DEFAULTS['archie_m'])
+        petro_params['archie_n'] = st.number_input("Archie n", value=PETRO_DEFAULTS['archie_n'])
+        petro_params['vsh_cutoff'] = st.slider("Vshale Cutoff", 0.0, 1.0, PETRO_DEFAULTS['vsh_cutoff'])
+        petro_params['phi_cutoff'] = st.slider("Porosity Cutoff", 0.0, 0.4, PETRO_DEFAULTS['phi_cutoff'])
+        petro_params['sw_cutoff'] = st.slider("Sw Cutoff", 0.0, 1.0, PETRO_DEFAULTS['sw_cutoff'])
+
 # Check if data is loaded
 if st.session_state.well_log_data is not None:
     df = st.session_state.well_log_data
     
+    # Add derived curves (VSH, PHID, PHIT, PHIE, SW, PAY) where inputs exist
+    if compute_petro:
+        df = add_petrophysics_curves(df, petro_params)
+    
+    # Add user-defined derived curves; petrophysics parameters are part of the data version
+    expressions = derived_column_controls('well_log', df.columns)
+    data_version = (get_dataset_version('well_log'), tuple(petro_params.items()) if compute_petro else None)
+    df = add_derived_columns(df, expressions, 'well_log', data_version)
+    
     # Display well header information if available
     if 'las' in locals() and las is not None:
         st.subheader("Well Header Information")
@@ -80,6 +120,13 @@ if st.session_state.well_log_data is not None:
     st.subheader("Descriptive Statistics")
     st.dataframe(df.describe())
     
+    # Memory held by the loaded curves against dense float64
+    with st.expander("Memory Footprint"):
+        report = footprint_report(st.session_state.well_log_data)
+        totals = report.iloc[-1]
+        st.write(f"Loaded: {totals['Loaded KB']:,.0f} KB, as dense float64: {totals['Float64 KB']:,.0f} KB")
+        st.dataframe(report)
+    
     # Sidebar for plot controls
     st.sidebar.header("Plotting Options")
     
@@ -98,7 +145,7 @@ if st.session_state.well_log_data is not None:
     
     # Create plot
     fig = plot_well_log(df, selected_curve, depth_range)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(compact_figure(fig), use_container_width=True)
     
     # Multi-curve plot
     st.subheader("Multi-Curve Plot")
@@ -106,7 +153,8 @@ if st.session_state.well_log_data is not None:
     
     if selected_curves:
         fig = plot_multi_well_log(df, selected_curves, depth_range)
-        st.plotly_chart(fig, use_container_width=True)
+        payload_expander(fig, key="well_log_payload")
+        st.plotly_chart(compact_figure(fig), use_container_width=True)
     
     # Crossplot
     st.subheader("Crossplot")
@@ -122,7 +170,7 @@ if st.session_state.well_log_data is not None:
         color_by = st.selectbox("Color by", ["None"] + available_curves)
     
     # Filter data by depth range
-    filtered_df = df[(df['DEPTH'] >= depth_range[0]) & (df['DEPTH'] <= depth_range[1])]
+    filtered_df = filter_depth_range(df, depth_range)
     
     if color_by == "None":
         fig = px.scatter(filtered_df, x=x_curve, y=y_curve, title=f"{y_curve} vs {x_curve}")
@@ -130,14 +178,121 @@ if st.session_state.well_log_data is not None:
         fig = px.scatter(filtered_df, x=x_curve, y=y_curve, color=filtered_df[color_by],
                         title=f"{y_curve} vs {x_curve} (colored by {color_by})")
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(compact_figure(fig), use_container_width=True)
     
     # Correlation matrix
     st.subheader("Correlation Matrix")
     correlation_matrix = filtered_df.drop('DEPTH', axis=1).corr()
     fig = px.imshow(correlation_matrix, text_auto=True, color_continuous_scale='RdBu_r',
                    title="Well Log Correlation Matrix")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(compact_figure(fig), use_container_width=True)
+    
+    # Export the depth-filtered curves
+    st.subheader("Export Filtered Data")
+    export_download(lambda: iter_frame_chunks(filtered_df), "well_log_filtered",
+                    formats=("CSV", "Parquet", "LAS"), key="well_log_export",
+                    las=las if 'las' in locals() else None,
+                    depth_bounds=(float(filtered_df['DEPTH'].min()), float(filtered_df['DEPTH'].max())))
+    
+    # Multi-well correlation on a common depth grid
+    st.subheader("Multi-Well Correlation")
+    
+    wells = {}
+    well_sources = {}
+    if data_source == "Use Sample Data":
+        for path in get_sample_well_log_paths():
+            _, well_df = load_las_file(path)
+            if well_df is not None:
+                wells[os.path.basename(path)] = well_df
+                well_sources[os.path.basename(path)] = (path, file_version(path))
+    
+    correlation_files = st.file_uploader("Add LAS files for correlation", type=["las"] + COMPRESSED_EXTENSIONS,
+                                         accept_multiple_files=True)
+    for correlation_file in correlation_files or []:
+        _, well_df = load_las_file(correlation_file)
+        if well_df is not None:
+            wells[correlation_file.name] = well_df
+            well_sources[correlation_file.name] = correlation_file.id
+    
+    set_multi_well_data(wells)
+    
+    # Compute derived curves for all wells in one pass per curve
+    if compute_petro and wells:
+        wells = compute_petrophysics(wells, petro_params)
+    
+    if len(wells) > 1:
+        shared_curves = common_curves(wells)
+        correlation_curves = st.multiselect("Select correlation curves", shared_curves,
+                                            default=shared_curves[:1])
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            grid_step = st.number_input("Depth Grid Step (m)", min_value=0.1, value=1.0, step=0.1)
+        
+        with col2:
+            flatten = st.checkbox("Flatten on formation top")
+        
+        tops = None
+        if flatten:
+            tops = {}
+            for name, well_df in wells.items():
+                tops[name] = st.number_input(f"Top depth for {name}", value=float(well_df['DEPTH'].min()))
+        
+        if correlation_curves:
+            depth_grid = build_depth_grid(wells, step=grid_step, tops=tops)
+            cube = regrid_wells(wells, correlation_curves, depth_grid, tops=tops)
+            fig = plot_multi_well_tracks(cube, correlation_curves)
+            if flatten:
+                fig.update_yaxes(title_text="Depth below top (m)", row=1, col=1)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
+    else:
+        st.info("Load at least two LAS files to build a multi-well correlation panel.")
+    
+    # Zones between formation tops, summarized for every well the tops name
+    st.subheader("Zones")
+    tops_source = st.radio("Formation Tops", ["Edit Tops", "Upload Tops CSV"], horizontal=True)
+    
+    tops = None
+    if tops_source == "Edit Tops":
+        default_tops = pd.DataFrame({'Well': [well_name], 'Zone': ['Zone 1'], 'Top': [float(df['DEPTH'].min())]})
+        edited_tops = st.data_editor(default_tops, num_rows="dynamic", key="tops_editor")
+        tops = clean_tops(edited_tops)
+    else:
+        tops_file = st.file_uploader("Choose a tops CSV (Well, Zone, Top and optionally Base)", type=["csv"])
+        if tops_file is not None:
+            try:
+                tops = read_tops(tops_file)
+            except Exception as e:
+                st.error(f"Error loading formation tops: {e}")
+    
+    if tops is not None and not tops.empty:
+        # The current well, with its derived curves, alongside the correlation wells
+        zone_wells = {**wells, well_name: df}
+        petro_version = tuple(petro_params.items()) if compute_petro else None
+        zone_versions = {name: (source, petro_version) for name, source in well_sources.items()}
+        zone_versions[well_name] = (data_version, tuple(expressions.items()))
+        zone_curves = st.multiselect("Zone Average Curves", available_curves,
+                                     default=[col for col in available_curves if col != 'PAY'][:4])
+        
+        try:
+            summary = zonal_summary(zone_wells, tops, zone_curves, zone_versions)
+            if summary.empty:
+                st.warning("None of the wells in the tops table is loaded.")
+            else:
+                st.dataframe(summary)
+            
+            zone_index = build_zone_index(tops)
+            if well_name in zone_index:
+                selected_zones = st.multiselect("Zones to Crossplot", zone_index[well_name]['zones'],
+                                                default=zone_index[well_name]['zones'])
+                zoned = zone_samples(df, zone_index[well_name], selected_zones)
+                if not zoned.empty:
+                    fig = px.scatter(zoned, x=x_curve, y=y_curve, color='Zone',
+                                     title=f"{y_curve} vs {x_curve} by Zone")
+                    st.plotly_chart(compact_figure(fig), use_container_width=True)
+        except ValueError as e:
+            st.error(f"Invalid formation tops: {e}")
     
 else:
     st.info("Please upload a LAS file or use sample data to begin analysis.")
\ No newline at end of file
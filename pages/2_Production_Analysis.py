@@ -6,9 +6,19 @@ import plotly.graph_objects as go
 import os
 
 # Import utility functions
-from utils.data_loader import load_production_data, get_sample_data_path
-from utils.visualization import plot_production_trend
-from utils.session_state import initialize_session_state, set_production_data
+from utils.data_loader import load_production_data, chunk_preparer, COMPRESSED_EXTENSIONS
+from utils.prewarm import select_sample_dataset
+from utils.dataset_registry import file_version
+from utils.visualization import plot_production_trend, plot_probabilistic_forecast, plot_type_curve
+from utils.figure_encoding import compact_figure, payload_expander
+from utils.data_processing import FREQ_MAP, resample_production, resample_production_chunks, total_production, add_moving_average
+from utils.export import export_download, iter_csv_chunks, iter_frame_chunks
+from utils.time_index import time_index, time_window, time_range_slider, filter_time_range
+from utils.well_matrix import session_well_view, well_mask, resampled_frame, session_field_totals
+from utils.type_curves import TYPE_CURVE_NORMALIZATIONS, session_type_curve
+from utils.forecasting import EUR_HORIZON_YEARS, probabilistic_forecast
+from utils.expressions import derived_column_controls, add_derived_columns, assign_expressions
+from utils.session_state import initialize_session_state, set_production_data, get_dataset_version
 from utils.style_manager import load_css, apply_theme, display_header_image
 
 apply_theme(theme="light")  # or "dark"
@@ -39,24 +49,27 @@ st.sidebar.header("Data Loading")
 
 # Option to use sample data or upload own data
 data_source = st.sidebar.radio("Select Data Source", ["Use Sample Data", "Upload CSV File"])
+data_file = None
 
 if data_source == "Use Sample Data":
-    sample_path = get_sample_data_path('production')
+    sample_path = select_sample_dataset('production')
     if sample_path and os.path.exists(sample_path):
         df = load_production_data(sample_path)
         if df is not None:
-            set_production_data(df)
+            set_production_data(df, source=(sample_path, file_version(sample_path)))
+            data_file = sample_path
             st.sidebar.success("Sample data loaded successfully!")
     else:
         st.sidebar.error("Sample data not found. Please upload your own data.")
         data_source = "Upload CSV File"
 
 if data_source == "Upload CSV File":
-    uploaded_file = st.sidebar.file_uploader("Choose a CSV file", type="csv")
+    uploaded_file = st.sidebar.file_uploader("Choose a CSV file", type=["csv"] + COMPRESSED_EXTENSIONS)
     if uploaded_file is not None:
         df = load_production_data(uploaded_file)
         if df is not None:
-            set_production_data(df)
+            set_production_data(df, source=uploaded_file.id)
+            data_file = uploaded_file
             st.sidebar.success("File uploaded successfully!")
 
 # Check if data is loaded
@@ -71,9 +84,17 @@ if st.session_state.production_data is not None:
     required_columns = ['Date']
     production_columns = [col for col in df.columns if 'production' in col.lower() or 'oil' in col.lower() or 'gas' in col.lower()]
     
+    # User-defined derived columns are evaluated on the resampled data, so ratios use period totals
+    expressions = derived_column_controls('production', df.columns)
+    production_columns += list(expressions)
+    
     if all(col in df.columns for col in required_columns) and production_columns:
-        # Set Date as index for resampling
-        df_indexed = df.set_index('Date')
+        # Sidebar for the time window, answered by bisection on the per-well sorted data
+        st.sidebar.header("Time Range")
+        index = time_index(df, 'Date', 'Well_ID' if 'Well_ID' in df.columns else None, get_dataset_version('production'))
+        time_range = time_range_slider("Date Range", df, index, pd.Timedelta(days=1))
+        source_chunks = lambda: (filter_time_range(chunk, time_range, 'Date')
+                                 for chunk in iter_csv_chunks(data_file, chunk_preparer(data_file, 'production')))
         
         # Check if Well_ID column exists for grouping
         if 'Well_ID' in df.columns:
@@ -83,61 +104,63 @@ if st.session_state.production_data is not None:
             selected_wells = st.sidebar.multiselect("Select Wells", available_wells, default=available_wells)
             
             if selected_wells:
-                # Filter data by selected wells
-                filtered_df = df[df['Well_ID'].isin(selected_wells)]
-                
                 # Group by Well_ID and Date, then resample
                 st.subheader("Resampled Production Data")
-                resample_freq = st.selectbox("Select Resampling Frequency", ["Daily", "Weekly", "Monthly", "Quarterly", "Yearly"])
-                
-                freq_map = {
-                    "Daily": "D",
-                    "Weekly": "W",
-                    "Monthly": "M",
-                    "Quarterly": "Q",
-                    "Yearly": "Y"
-                }
+                resample_freq = st.selectbox("Select Resampling Frequency", list(FREQ_MAP))
                 
-                # Set Date as index
-                filtered_df_indexed = filtered_df.set_index('Date')
+                # Per-well period totals come from the session's well x time matrix; a new selection only masks its rows
+                matrix, view = session_well_view(df, get_dataset_version('production'), FREQ_MAP[resample_freq], time_range)
+                selected_mask = well_mask(matrix, selected_wells)
+                resampled_df = resampled_frame(matrix, view, selected_mask)
+                resampled_df = add_derived_columns(resampled_df, expressions, 'production',
+                                                   (get_dataset_version('production'), resample_freq, tuple(selected_wells), time_range))
                 
-                # Group by Well_ID and resample
-                resampled_dfs = []
-                for well in selected_wells:
-                    well_data = filtered_df_indexed[filtered_df_indexed['Well_ID'] == well]
-                    resampled = well_data.resample(freq_map[resample_freq]).sum()
-                    resampled['Well_ID'] = well
-                    resampled_dfs.append(resampled)
-                
-                if resampled_dfs:
-                    resampled_df = pd.concat(resampled_dfs).reset_index()
+                if not resampled_df.empty:
                     st.dataframe(resampled_df.head())
                     
+                    # Export the resampled view, re-aggregating the source file chunk by chunk
+                    if data_file is not None:
+                        make_chunks = lambda: iter_frame_chunks(assign_expressions(resample_production_chunks(
+                            source_chunks(), FREQ_MAP[resample_freq], wells=selected_wells), expressions))
+                    else:
+                        make_chunks = lambda: iter_frame_chunks(resampled_df)
+                    export_download(make_chunks, f"production_{resample_freq.lower()}", key="production_export")
+                    
                     # Production trend visualization
                     st.subheader("Production Trends")
                     
                     # Select production column to visualize
-                    production_col = st.selectbox("Select Production Column", production_columns)
+                    production_col = st.selectbox("Select Production Column", [col for col in production_columns if col in resampled_df.columns])
                     
                     # Create production trend plot
                     fig = plot_production_trend(resampled_df, production_col, 'Well_ID')
-                    st.plotly_chart(fig, use_container_width=True)
+                    payload_expander(fig, key="production_payload")
+                    st.plotly_chart(compact_figure(fig), use_container_width=True)
                     
                     # Calculate and plot moving averages
                     st.subheader("Moving Averages")
                     
-                    # Group by date to get total production
-                    total_production = resampled_df.groupby('Date')[production_col].sum().reset_index()
+                    # Field totals of matrix columns are updated by the wells added or removed since the last run
+                    if production_col in matrix['columns']:
+                        field_production = session_field_totals(view, production_col, selected_mask)
+                    else:
+                        # A derived column (e.g. a water cut) is evaluated on the field totals of its base columns,
+                        # not summed across wells
+                        base_columns = [col for col in resampled_df.columns if col in matrix['columns']]
+                        field_expressions = {name: expression for name, expression in expressions.items()
+                                             if name in resampled_df.columns}
+                        field_production = assign_expressions(total_production(resampled_df, base_columns),
+                                                              field_expressions)[['Date', production_col]]
                     
                     # Calculate moving averages
                     window_size = st.slider("Moving Average Window Size", 2, 12, 3)
-                    total_production[f'{window_size}-Period MA'] = total_production[production_col].rolling(window=window_size).mean()
+                    field_production = add_moving_average(field_production, production_col, window_size)
                     
                     # Plot total production with moving average
                     fig = go.Figure()
-                    fig.add_trace(go.Scatter(x=total_production['Date'], y=total_production[production_col],
+                    fig.add_trace(go.Scatter(x=field_production['Date'], y=field_production[production_col],
                                             mode='lines', name='Total Production'))
-                    fig.add_trace(go.Scatter(x=total_production['Date'], y=total_production[f'{window_size}-Period MA'],
+                    fig.add_trace(go.Scatter(x=field_production['Date'], y=field_production[f'{window_size}-Period MA'],
                                             mode='lines', name=f'{window_size}-Period Moving Average'))
                     
                     fig.update_layout(title=f"Total {production_col} with {window_size}-Period Moving Average",
@@ -145,7 +168,11 @@ if st.session_state.production_data is not None:
                                     yaxis_title=production_col,
                                     hovermode="x unified")
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(compact_figure(fig), use_container_width=True)
+                    
+                    if f'Cumulative {production_col}' in field_production.columns and not field_production.empty:
+                        st.write(f"**Cumulative {production_col} (selected wells):** "
+                                 f"{field_production[f'Cumulative {production_col}'].iloc[-1]:,.2f}")
                     
                     # Decline curve analysis
                     st.subheader("Decline Curve Analysis")
@@ -153,7 +180,7 @@ if st.session_state.production_data is not None:
                     # Simple exponential decline model
                     if st.checkbox("Show Decline Curve Analysis"):
                         # Filter out zero or NaN values
-                        valid_data = total_production[total_production[production_col] > 0].copy()
+                        valid_data = field_production[field_production[production_col] > 0].copy()
                         
                         if len(valid_data) > 5:  # Need enough data points for meaningful analysis
                             # Convert dates to numeric (days since first date)
@@ -191,7 +218,7 @@ if st.session_state.production_data is not None:
                                             yaxis_title=production_col,
                                             hovermode="x unified")
                             
-                            st.plotly_chart(fig, use_container_width=True)
+                            st.plotly_chart(compact_figure(fig), use_container_width=True)
                             
                             # Display decline parameters
                             st.write(f"**Exponential Decline Parameters:**")
@@ -200,41 +227,76 @@ if st.session_state.production_data is not None:
                             st.write(f"R-squared: {r_value**2:.4f}")
                         else:
                             st.warning("Not enough valid data points for decline curve analysis.")
+                    
+                    # Probabilistic forecast from per-well decline fit uncertainty
+                    if st.checkbox("Show Probabilistic Forecast (P10/P50/P90)"):
+                        col1, col2, col3 = st.columns(3)
+                        
+                        with col1:
+                            n_realizations = st.select_slider("Realizations", [100, 500, 1000, 5000, 10000], value=1000)
+                        
+                        with col2:
+                            forecast_periods = st.number_input("Forecast Periods", min_value=1,
+                                                               value=max(1, len(field_production) // 2))
+                        
+                        with col3:
+                            economic_limit = st.number_input("Economic Limit (per period)", min_value=0.0, value=0.0)
+                        
+                        forecast = probabilistic_forecast(resampled_df, production_col, FREQ_MAP[resample_freq],
+                                                          int(forecast_periods), n_realizations, economic_limit)
+                        
+                        fig = plot_probabilistic_forecast(field_production, production_col, forecast)
+                        fig.update_layout(title=f"Probabilistic {production_col} Forecast ({n_realizations} realizations)")
+                        st.plotly_chart(compact_figure(fig), use_container_width=True)
+                        
+                        st.write(f"**Estimated Ultimate Recovery by Well** (to the economic limit, at most {EUR_HORIZON_YEARS} years; "
+                                 f"P90 low, P10 high)")
+                        st.dataframe(forecast['eur'])
+                    
+                    # Type curve: wells aligned on their first producing month, independent of the date range
+                    st.subheader("Type Curve")
+                    
+                    if production_col in matrix['columns'] and st.checkbox("Show Type Curve"):
+                        normalization = st.selectbox("Normalize Rates By", list(TYPE_CURVE_NORMALIZATIONS))
+                        curve = session_type_curve(matrix, production_col, selected_mask,
+                                                   TYPE_CURVE_NORMALIZATIONS[normalization])
+                        
+                        if len(curve['months']):
+                            y_label = production_col if normalization == "None" else f"{production_col} / {normalization}"
+                            fig = plot_type_curve(curve, f"{y_label} (monthly)")
+                            fig.update_layout(title=f"{production_col} Type Curve ({int(selected_mask.sum())} wells)")
+                            st.plotly_chart(compact_figure(fig), use_container_width=True)
+                        else:
+                            st.warning("None of the selected wells has a producing month.")
             else:
                 st.warning("Please select at least one well.")
         else:
             # No Well_ID column, treat as single well
             st.subheader("Resampled Production Data")
-            resample_freq = st.selectbox("Select Resampling Frequency", ["Daily", "Weekly", "Monthly", "Quarterly", "Yearly"])
-            
-            freq_map = {
-                "Daily": "D",
-                "Weekly": "W",
-                "Monthly": "M",
-                "Quarterly": "Q",
-                "Yearly": "Y"
-            }
+            resample_freq = st.selectbox("Select Resampling Frequency", list(FREQ_MAP))
             
             # Resample data
-            resampled_df = df_indexed.resample(freq_map[resample_freq]).sum().reset_index()
+            resampled_df = resample_production(time_window(df, index, time_range), FREQ_MAP[resample_freq])
+            resampled_df = add_derived_columns(resampled_df, expressions, 'production',
+                                               (get_dataset_version('production'), resample_freq, time_range))
             st.dataframe(resampled_df.head())
             
             # Production trend visualization
             st.subheader("Production Trends")
             
             # Select production column to visualize
-            production_col = st.selectbox("Select Production Column", production_columns)
+            production_col = st.selectbox("Select Production Column", [col for col in production_columns if col in resampled_df.columns])
             
             # Create production trend plot
             fig = plot_production_trend(resampled_df, production_col)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
             
             # Calculate and plot moving averages
             st.subheader("Moving Averages")
             
             # Calculate moving averages
             window_size = st.slider("Moving Average Window Size", 2, 12, 3)
-            resampled_df[f'{window_size}-Period MA'] = resampled_df[production_col].rolling(window=window_size).mean()
+            resampled_df = add_moving_average(resampled_df, production_col, window_size)
             
             # Plot production with moving average
             fig = go.Figure()
@@ -248,7 +310,17 @@ if st.session_state.production_data is not None:
                             yaxis_title=production_col,
                             hovermode="x unified")
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
+            
+            # Export the resampled view with its moving average
+            if data_file is not None:
+                make_chunks = lambda: iter_frame_chunks(add_moving_average(assign_expressions(
+                    resample_production_chunks(source_chunks(),
+                                               FREQ_MAP[resample_freq]), expressions),
+                    production_col, window_size))
+            else:
+                make_chunks = lambda: iter_frame_chunks(resampled_df)
+            export_download(make_chunks, f"production_{resample_freq.lower()}", key="production_export")
     else:
         st.error("The data does not have the required columns (Date and production data columns).")
 else:
@@ -7,9 +7,18 @@ from plotly.subplots import make_subplots
 import os
 
 # Import utility functions
-from utils.data_loader import load_drilling_data, get_sample_data_path
-from utils.visualization import plot_drilling_kpi
-from utils.session_state import initialize_session_state, set_drilling_data
+from utils.data_loader import load_drilling_data, load_las_file, get_sample_data_path, chunk_preparer, COMPRESSED_EXTENSIONS
+from utils.prewarm import select_sample_dataset
+from utils.dataset_registry import file_version
+from utils.visualization import plot_drilling_kpi, add_event_markers
+from utils.figure_encoding import compact_figure, payload_expander
+from utils.data_processing import filter_drilling_data, filter_depth_range
+from utils.depth_join import JOIN_METHODS, depth_join
+from utils.export import export_download, iter_csv_chunks, iter_frame_chunks
+from utils.time_index import time_index, time_window, time_range_slider, filter_time_range
+from utils.expressions import derived_column_controls, add_derived_columns, assign_expressions
+from utils.event_detection import EVENT_DEFAULTS, session_drilling_events
+from utils.session_state import initialize_session_state, set_drilling_data, get_dataset_version
 from utils.style_manager import load_css, apply_theme, display_header_image
 
 apply_theme(theme="light")  # or "dark"
@@ -40,30 +49,37 @@ st.sidebar.header("Data Loading")
 
 # Option to use sample data or upload own data
 data_source = st.sidebar.radio("Select Data Source", ["Use Sample Data", "Upload CSV File"])
+data_file = None
 
 if data_source == "Use Sample Data":
-    sample_path = get_sample_data_path('drilling')
+    sample_path = select_sample_dataset('drilling')
     if sample_path and os.path.exists(sample_path):
         df = load_drilling_data(sample_path)
         if df is not None:
-            set_drilling_data(df)
+            set_drilling_data(df, source=(sample_path, file_version(sample_path)))
+            data_file = sample_path
             st.sidebar.success("Sample data loaded successfully!")
     else:
         st.sidebar.error("Sample data not found. Please upload your own data.")
         data_source = "Upload CSV File"
 
 if data_source == "Upload CSV File":
-    uploaded_file = st.sidebar.file_uploader("Choose a CSV file", type="csv")
+    uploaded_file = st.sidebar.file_uploader("Choose a CSV file", type=["csv"] + COMPRESSED_EXTENSIONS)
     if uploaded_file is not None:
         df = load_drilling_data(uploaded_file)
         if df is not None:
-            set_drilling_data(df)
+            set_drilling_data(df, source=uploaded_file.id)
+            data_file = uploaded_file
             st.sidebar.success("File uploaded successfully!")
 
 # Check if data is loaded
 if st.session_state.drilling_data is not None:
     df = st.session_state.drilling_data
     
+    # Add user-defined derived columns
+    expressions = derived_column_controls('drilling', df.columns)
+    df = add_derived_columns(df, expressions, 'drilling', get_dataset_version('drilling'))
+    
     # Display the DataFrame
     st.subheader("Drilling Data")
     st.dataframe(df.head())
@@ -79,23 +95,51 @@ if st.session_state.drilling_data is not None:
         max_depth = float(df['Depth'].max())
         depth_range = st.sidebar.slider("Depth Range (m)", min_depth, max_depth, (min_depth, max_depth))
         
-        # Filter data by depth range
-        filtered_df = df[(df['Depth'] >= depth_range[0]) & (df['Depth'] <= depth_range[1])]
+        # Sidebar for the time window, answered by bisection on the time-sorted record
+        time_range = None
+        window_df = df
+        if 'Timestamp' in df.columns and pd.api.types.is_datetime64_any_dtype(df['Timestamp']):
+            st.sidebar.header("Time Range")
+            index = time_index(df, 'Timestamp', None, get_dataset_version('drilling'))
+            time_range = time_range_slider("Time Range", df, index, pd.Timedelta(minutes=1))
+            window_df = time_window(df, index, time_range)
         
         # Check if Formation column exists
+        selected_formations = None
         if 'Formation' in df.columns:
             # Sidebar for formation selection
             st.sidebar.header("Formation Selection")
             available_formations = df['Formation'].unique().tolist()
             selected_formations = st.sidebar.multiselect("Select Formations", available_formations, default=available_formations)
+        
+        # Filter data by time range, depth range and formation
+        filtered_df = filter_drilling_data(window_df, depth_range, selected_formations)
+        
+        # Event detection runs on the full record so rolling baselines are continuous
+        st.sidebar.header("Event Detection")
+        detect_events = st.sidebar.checkbox("Detect Drilling Events")
+        events = None
+        
+        if detect_events:
+            event_params = dict(EVENT_DEFAULTS)
+            with st.sidebar.expander("Detection Parameters"):
+                event_params['window'] = st.slider("Baseline Window (samples)", 5, 200, EVENT_DEFAULTS['window'])
+                event_params['z_threshold'] = st.slider("Z-Score Threshold", 1.0, 6.0, EVENT_DEFAULTS['z_threshold'])
+                event_params['stick_slip_cv'] = st.slider("Stick-Slip Torque CV", 0.05, 1.0, EVENT_DEFAULTS['stick_slip_cv'])
+                event_params['cusum_h'] = st.slider("MSE Change Sensitivity (CUSUM h)", 1.0, 20.0, EVENT_DEFAULTS['cusum_h'])
+            
+            all_events = session_drilling_events(df, get_dataset_version('drilling'), event_params)
+            
+            # Keep only events on rows that pass the current filters
+            filtered_rows = df.index.get_indexer(filtered_df.index)
+            events = all_events[all_events['Row'].isin(filtered_rows)]
             
-            if selected_formations:
-                # Further filter by formation
-                filtered_df = filtered_df[filtered_df['Formation'].isin(selected_formations)]
+            with st.expander(f"Detected Events ({len(events)})"):
+                st.dataframe(events)
         
         # Visualization options
         st.sidebar.header("Visualization Options")
-        plot_type = st.sidebar.selectbox("Select Plot Type", ["Depth-Based", "Time-Based", "Crossplot", "KPI Summary"])
+        plot_type = st.sidebar.selectbox("Select Plot Type", ["Depth-Based", "Time-Based", "Crossplot", "Log Crossplot", "KPI Summary"])
         
         if plot_type == "Depth-Based":
             st.subheader("Depth-Based Drilling Parameters")
@@ -121,11 +165,16 @@ if st.session_state.drilling_data is not None:
                         name=param, 
                         line=dict(color=colors[i % len(colors)])
                     ), row=1, col=i+1)
+                    
+                    if events is not None:
+                        add_event_markers(fig, events[events['Channel'] == param], 'Value', 'Depth',
+                                          row=1, col=i+1, showlegend=(i == 0))
                 
                 # Reverse y-axis (depth increases downward)
                 fig.update_yaxes(autorange="reversed")
                 
-                st.plotly_chart(fig, use_container_width=True)
+                payload_expander(fig, key="drilling_payload")
+                st.plotly_chart(compact_figure(fig), use_container_width=True)
         
         elif plot_type == "Time-Based":
             if 'Timestamp' in df.columns:
@@ -150,12 +199,15 @@ if st.session_state.drilling_data is not None:
                             line=dict(color=colors[i % len(colors)])
                         ))
                     
+                    if events is not None:
+                        add_event_markers(fig, events[events['Channel'].isin(params)], 'Timestamp', 'Value')
+                    
                     fig.update_layout(title="Time-Based Drilling Parameters",
                                     xaxis_title="Time",
                                     yaxis_title="Parameter Value",
                                     hovermode="x unified")
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(compact_figure(fig), use_container_width=True)
             else:
                 st.warning("Time-based visualization requires a 'Timestamp' column in the data.")
         
@@ -180,7 +232,65 @@ if st.session_state.drilling_data is not None:
                                 title=f"{y_param} vs {x_param} Relationship",
                                 color_continuous_scale="Viridis" if color_by == "Depth" else None)
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(compact_figure(fig), use_container_width=True)
+        
+        elif plot_type == "Log Crossplot":
+            st.subheader("Drilling vs Well Log Crossplot")
+            
+            # Use the well log loaded on the Well Log Analysis page, else the sample LAS
+            log_df = st.session_state.well_log_data
+            if log_df is None:
+                sample_las = get_sample_data_path('well_log')
+                if sample_las and os.path.exists(sample_las):
+                    _, log_df = load_las_file(sample_las)
+            
+            if log_df is None or 'DEPTH' not in log_df.columns:
+                st.warning("Load a LAS file on the Well Log Analysis page to join its curves by depth.")
+            else:
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    direction = st.selectbox("Join Direction", ["Logs onto drilling samples", "Drilling data onto log samples"])
+                
+                with col2:
+                    join_method = st.selectbox("Join Method", list(JOIN_METHODS))
+                
+                with col3:
+                    tolerance = st.number_input("Max Depth Offset (m, 0 = auto)", min_value=0.0, value=0.0)
+                
+                # Join on depth; each row of the base frame gets the other dataset's curves
+                log_curves = [col for col in log_df.columns if col != 'DEPTH']
+                if direction == "Logs onto drilling samples":
+                    base, depth_column = filtered_df, 'Depth'
+                    joined = depth_join(filtered_df, log_df, 'Depth', 'DEPTH', log_curves,
+                                        JOIN_METHODS[join_method], tolerance or None, suffix='_log')
+                else:
+                    base, depth_column = filter_depth_range(log_df, depth_range), 'DEPTH'
+                    joined = depth_join(base, filtered_df, 'DEPTH', 'Depth', kpi_columns,
+                                        JOIN_METHODS[join_method], tolerance or None, suffix='_drilling')
+                attached = [col for col in joined.columns if col not in base.columns]
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    x_options = kpi_columns if depth_column == 'Depth' else attached
+                    x_param = st.selectbox("Drilling Parameter", x_options, index=x_options.index('MSE') if 'MSE' in x_options else 0)
+                
+                with col2:
+                    y_options = attached if depth_column == 'Depth' else log_curves
+                    y_param = st.selectbox("Log Curve", y_options, index=y_options.index('GR') if 'GR' in y_options else 0)
+                
+                matched = joined.dropna(subset=[x_param, y_param])
+                st.write(f"{len(matched)} of {len(joined)} samples matched within the depth tolerance.")
+                
+                if not matched.empty:
+                    fig = px.scatter(matched, x=x_param, y=y_param, color=depth_column,
+                                    title=f"{y_param} vs {x_param} by Depth",
+                                    color_continuous_scale="Viridis")
+                    st.plotly_chart(compact_figure(fig), use_container_width=True)
+                
+                with st.expander("Joined Data"):
+                    st.dataframe(joined.head(100))
         
         elif plot_type == "KPI Summary":
             st.subheader("Drilling KPI Summary")
@@ -204,7 +314,17 @@ if st.session_state.drilling_data is not None:
                             title=f"Average {kpi} by Formation",
                             color="Formation")
                 
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(compact_figure(fig), use_container_width=True)
+        
+        # Export the filtered view, streaming the source file through the same filters
+        st.subheader("Export Filtered Data")
+        if data_file is not None:
+            make_chunks = lambda: (assign_expressions(filter_drilling_data(filter_time_range(chunk, time_range, 'Timestamp'),
+                                                                          depth_range, selected_formations), expressions)
+                                   for chunk in iter_csv_chunks(data_file, chunk_preparer(data_file, 'drilling')))
+        else:
+            make_chunks = lambda: iter_frame_chunks(filtered_df)
+        export_download(make_chunks, "drilling_filtered", key="drilling_export")
     else:
         st.error("The data does not have the required columns (Depth and KPI columns).")
 else:
@@ -0,0 +1,53 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Most decimals looked for when deciding whether a curve fits in float32
+MAX_CURVE_DECIMALS = 8
+
+def curve_decimals(values):
+    """Fewest decimals that reproduce every finite value of a curve, or None beyond MAX_CURVE_DECIMALS."""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return 0
+    scale = max(1.0, float(np.abs(finite).max()))
+    for decimals in range(MAX_CURVE_DECIMALS + 1):
+        if np.abs(np.round(finite, decimals) - finite).max() <= scale * 1e-12:
+            return decimals
+    return None
+
+def curve_dtype(values):
+    """float32 when it still rounds back to every value at the curve's decimals, else float64."""
+    decimals = curve_decimals(values)
+    if decimals is None:
+        return np.float64
+    finite = values[np.isfinite(values)]
+    error = np.abs(finite.astype(np.float32).astype(np.float64) - finite)
+    return np.float32 if error.size == 0 or error.max() < 0.5 * 10.0 ** -decimals else np.float64
+
+def downcast_curves(df):
+    """Store each float column of a log as float32 where that loses none of its printed precision."""
+    for col in df.columns:
+        if df[col].dtype == np.float64 and curve_dtype(df[col].to_numpy()) == np.float32:
+            df[col] = df[col].astype(np.float32)
+    return df
+
+@st.cache_data(show_spinner=False)
+def footprint_report(df):
+    """Memory per curve as loaded and as dense float64.
+
+    Returns one row per curve plus a 'Total' row, in kilobytes.
+    """
+    rows = []
+    for col in df.columns:
+        valid = df[col].notna().mean() if len(df) else 0.0
+        rows.append({
+            'Curve': col,
+            'Stored As': str(df[col].dtype),
+            'Valid %': 100 * valid,
+            'Float64 KB': len(df) * 8 / 1024,
+            'Loaded KB': df[col].memory_usage(index=False, deep=True) / 1024,
+        })
+    report = pd.DataFrame(rows)
+    total = report[['Float64 KB', 'Loaded KB']].sum()
+    return pd.concat([report, pd.DataFrame([{'Curve': 'Total', **total}])], ignore_index=True)
@@ -1,75 +1,282 @@
 import streamlit as st
 import pandas as pd
 import lasio
-from io import StringIO
+import io
 import os
+import gzip
+import bz2
+import zipfile
+from contextlib import contextmanager, ExitStack
+from utils.shared_data import shared_store_enabled, shared_frame, freeze_frame
+from utils.time_index import sort_by_time
+from utils.schema import SNIFF_ROWS, sniff_csv, parse_times
+from utils.curve_storage import downcast_curves
+from utils.dataset_registry import file_version
 
-# Cache the data loading functions to improve performance
-@st.cache_data
-def load_las_file(file_path):
-    """Load a LAS file and return both the LAS object and a DataFrame."""
-    try:
+# Extensions accepted by the upload widgets besides the plain data format
+COMPRESSED_EXTENSIONS = ['gz', 'zip', 'bz2']
+
+# Parsed datasets kept per process as read-only handles
+DATASET_HANDLE_ENTRIES = 32
+
+@contextmanager
+def open_data_file(file_path):
+    """Open a path or uploaded file as a binary stream, decompressing gzip, bz2 and zip on the fly."""
+    with ExitStack() as stack:
         if isinstance(file_path, str):
-            # Load from file path
-            las = lasio.read(file_path)
+            stream = stack.enter_context(open(file_path, 'rb'))
         else:
-            # Load from uploaded file
-            stringio = StringIO(file_path.getvalue().decode("utf-8"))
-            las = lasio.read(stringio)
+            # A separate stream over the upload's buffer (shared, not copied), so
+            # closing it leaves the upload readable for later exports
+            stream = io.BytesIO(file_path.getvalue())
+        
+        # Detect the compression from the leading bytes rather than the file name
+        magic = stream.read(4)
+        stream.seek(0)
+        if magic[:2] == b'\x1f\x8b':
+            stream = stack.enter_context(gzip.GzipFile(fileobj=stream))
+        elif magic[:3] == b'BZh':
+            stream = stack.enter_context(bz2.BZ2File(stream))
+        elif magic == b'PK\x03\x04':
+            archive = stack.enter_context(zipfile.ZipFile(stream))
+            members = [info for info in archive.infolist()
+                       if not info.is_dir() and not info.filename.startswith('__MACOSX/')]
+            if not members:
+                raise ValueError("Zip archive contains no files")
+            stream = stack.enter_context(archive.open(members[0]))
+        
+        yield stream
+
+def _read_las_header_text(text):
+    """Read the header sections of a LAS text stream with lasio, stopping at the ~A line."""
+    header = []
+    for line in text:
+        header.append(line)
+        if line.lstrip().upper().startswith('~A'):
+            break
+    
+    return lasio.read(''.join(header), ignore_data=True)
+
+def _read_las_columns(text):
+    """Read a LAS header with lasio and its data section with pandas' C parser.
+
+    The DataFrame is None for wrapped data sections, which pandas cannot read.
+    """
+    las = _read_las_header_text(text)
+    if 'WRAP' in las.version and str(las.version['WRAP'].value).upper().startswith('Y'):
+        return las, None
+    
+    names = [curve.mnemonic for curve in las.curves]
+    df = pd.read_csv(text, sep=r'\s+', header=None, names=names, dtype=float, comment='#')
+    if 'NULL' in las.well:
+        df = df.mask(df == float(las.well['NULL'].value))
+    return las, df
+
+def _parse_las_file(file_path):
+    """Parse a LAS file from a path or uploaded file into the LAS object and a DataFrame."""
+    try:
+        with open_data_file(file_path) as stream:
+            # Decode and parse the data section incrementally from the stream
+            las, df = _read_las_columns(io.TextIOWrapper(stream, encoding="utf-8"))
+    except ValueError:
+        df = None
+    
+    if df is None:
+        # Wrapped or unusual data sections go through lasio's own reader
+        with open_data_file(file_path) as stream:
+            las = lasio.read(io.TextIOWrapper(stream, encoding="utf-8"))
         
         # Convert to DataFrame
         df = las.df()
         df = df.reset_index()
         df = df.rename(columns={'index': 'DEPTH'})
-        
-        return las, df
+    
+    return las, downcast_curves(df)
+
+def _file_version(file_path):
+    """Content version of a path, so cached handles follow edits; None for uploads."""
+    return file_version(file_path) if isinstance(file_path, str) else None
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_HANDLE_ENTRIES)
+def _las_handle(file_path, version):
+    """Parse a LAS file into a read-only frame that every session of the process shares."""
+    las, df = _parse_las_file(file_path)
+    return las, freeze_frame(df)
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_HANDLE_ENTRIES)
+def _read_las_header(file_path, version):
+    """Read only the header sections of a LAS file, which may be compressed."""
+    with open_data_file(file_path) as stream:
+        return _read_las_header_text(io.TextIOWrapper(stream, encoding="utf-8"))
+
+def load_las_file(file_path):
+    """Load a LAS file and return both the LAS object and a DataFrame.
+
+    Every caller gets the same read-only frame; write into a .copy() of it.
+    """
+    try:
+        if isinstance(file_path, str) and shared_store_enabled():
+            # Curves come from the shared store; only the small header is parsed per process
+            df = shared_frame('las', file_path, lambda path: _parse_las_file(path)[1])
+            return _read_las_header(file_path, _file_version(file_path)), df
+        return _las_handle(file_path, _file_version(file_path))
     except Exception as e:
         st.error(f"Error loading LAS file: {e}")
         return None, None
 
-@st.cache_data
+def prepare_production_frame(df, plan=None, state=None):
+    """Apply the production column conversions to a freshly read frame or chunk."""
+    # Convert date column to datetime
+    if 'Date' in df.columns:
+        df['Date'] = parse_times(df['Date'], plan['time_format'] if plan else None, state)
+    
+    return df
+
+def prepare_drilling_frame(df, plan=None, state=None):
+    """Apply the drilling column conversions to a freshly read frame or chunk."""
+    # Convert timestamp column to datetime
+    if 'Timestamp' in df.columns:
+        time_format = plan['time_format'] if plan else '%Y-%m-%d %H:%M:%S.%f'
+        df['Timestamp'] = parse_times(df['Timestamp'], time_format, state)
+    
+    return df
+
+_PREPARERS = {
+    'production': prepare_production_frame,
+    'drilling': prepare_drilling_frame,
+}
+
+def sniff_data_file(file_path, dataset):
+    """Read the header and first rows of a CSV and plan its full parse, failing fast on unusable files."""
+    with open_data_file(file_path) as stream:
+        try:
+            sample = pd.read_csv(stream, nrows=SNIFF_ROWS)
+        except pd.errors.EmptyDataError:
+            raise ValueError("File is empty")
+    
+    return sniff_csv(sample, dataset)
+
+def _parse_csv_dataset(file_path, dataset):
+    """Sniff, then fully parse a CSV dataset along the path the sample calls for."""
+    plan = sniff_data_file(file_path, dataset)
+    
+    notes = list(plan['notes'])
+    try:
+        # Fast path: pinned dtypes skip inference on every row
+        with open_data_file(file_path) as stream:
+            df = pd.read_csv(stream, dtype=plan['dtypes'])
+    except ValueError:
+        # Repair path: later rows disagree with the sample, so coerce the stray values to NaN
+        with open_data_file(file_path) as stream:
+            df = pd.read_csv(stream)
+        for col in plan['dtypes']:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+                values = pd.to_numeric(df[col], errors='coerce')
+                notes.append(f"{int(values.isna().sum() - df[col].isna().sum())} non-numeric {col} values were left empty.")
+                df[col] = values
+    
+    state = {}
+    df = _PREPARERS[dataset](df, plan, state)
+    
+    if state.get('bad_times'):
+        notes.append(f"{state['bad_times']} {plan['time_column']} values could not be parsed and were left empty.")
+    df.attrs['load_notes'] = notes
+    return df
+
+def chunk_preparer(file_path, dataset):
+    """Return a function that prepares consecutive chunks of a file the same way its full load does."""
+    plan = sniff_data_file(file_path, dataset)
+    state = {}
+    return lambda chunk: _PREPARERS[dataset](chunk, plan, state)
+
+def _show_load_notes(df):
+    """Warn about any repairs made while loading a dataset."""
+    for note in df.attrs.get('load_notes', []):
+        st.warning(note)
+
+def _parse_production_data(file_path):
+    """Read a production CSV from a path or uploaded file."""
+    df = _parse_csv_dataset(file_path, 'production')
+    
+    # Sort once per well so time windows are answered by bisection
+    return sort_by_time(df, 'Date', 'Well_ID' if 'Well_ID' in df.columns else None)
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_HANDLE_ENTRIES)
+def _production_handle(file_path, version):
+    """Parse production data into a read-only frame that every session of the process shares."""
+    return freeze_frame(_parse_production_data(file_path))
+
 def load_production_data(file_path):
-    """Load production data from a CSV file."""
+    """Load production data from a CSV file.
+
+    Every caller gets the same read-only frame; write into a .copy() of it.
+    """
     try:
-        if isinstance(file_path, str):
-            # Load from file path
-            df = pd.read_csv(file_path)
+        if isinstance(file_path, str) and shared_store_enabled():
+            df = shared_frame('production', file_path, _parse_production_data)
         else:
-            # Load from uploaded file
-            df = pd.read_csv(file_path)
-        
-        # Convert date column to datetime
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'])
-        
+            df = _production_handle(file_path, _file_version(file_path))
+        _show_load_notes(df)
         return df
     except Exception as e:
         st.error(f"Error loading production data: {e}")
         return None
 
-@st.cache_data
+def _parse_drilling_data(file_path):
+    """Read a drilling CSV from a path or uploaded file."""
+    df = _parse_csv_dataset(file_path, 'drilling')
+    
+    return sort_by_time(df, 'Timestamp')
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_HANDLE_ENTRIES)
+def _drilling_handle(file_path, version):
+    """Parse drilling data into a read-only frame that every session of the process shares."""
+    return freeze_frame(_parse_drilling_data(file_path))
+
 def load_drilling_data(file_path):
-    """Load drilling data from a CSV file."""
+    """Load drilling data from a CSV file.
+
+    Every caller gets the same read-only frame; write into a .copy() of it.
+    """
     try:
-        if isinstance(file_path, str):
-            # Load from file path
-            df = pd.read_csv(file_path)
+        if isinstance(file_path, str) and shared_store_enabled():
+            df = shared_frame('drilling', file_path, _parse_drilling_data)
         else:
-            # Load from uploaded file
-            df = pd.read_csv(file_path)
-        
-        # Convert timestamp column to datetime
-        if 'Timestamp' in df.columns:
-            df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%Y-%m-%d %H:%M:%S.%f')
-        
+            df = _drilling_handle(file_path, _file_version(file_path))
+        _show_load_notes(df)
         return df
     except Exception as e:
         st.error(f"Error loading drilling data: {e}")
         return None
 
+def prewarm_dataset(kind, file_path):
+    """Parse a data file into the cache its loader reads and return that shared frame.
+
+    Errors are raised rather than shown, for callers outside a page.
+    """
+    if shared_store_enabled():
+        parse = {
+            'well_log': lambda path: _parse_las_file(path)[1],
+            'production': _parse_production_data,
+            'drilling': _parse_drilling_data,
+        }[kind]
+        return shared_frame('las' if kind == 'well_log' else kind, file_path, parse)
+    if kind == 'well_log':
+        return _las_handle(file_path, _file_version(file_path))[1]
+    handle = _production_handle if kind == 'production' else _drilling_handle
+    return handle(file_path, _file_version(file_path))
+
+# Environment variable that points the sample data paths at another directory
+DATA_DIR_ENV = 'OG_DASHBOARD_DATA_DIR'
+
+def get_data_dir():
+    """Get the directory holding the sample data files."""
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    return os.environ.get(DATA_DIR_ENV, default_dir)
+
 def get_sample_data_path(data_type):
     """Get the path to sample data files."""
-    base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    base_dir = get_data_dir()
     
     if data_type == 'well_log':
         return os.path.join(base_dir, 'synthetic_well.las')
@@ -78,4 +285,13 @@ def get_sample_data_path(data_type):
     elif data_type == 'drilling':
         return os.path.join(base_dir, 'drilling_data.csv')
     else:
-        return None
\ No newline at end of file
+        return None
+
+def get_sample_well_log_paths():
+    """Get the paths to every sample LAS file under the data directory."""
+    base_dir = get_data_dir()
+    
+    paths = []
+    for root, _, files in os.walk(base_dir):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith('.las'))
+    return sorted(paths)
\ No newline at end of file
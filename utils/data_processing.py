@@ -0,0 +1,56 @@
+import pandas as pd
+
+# Resampling frequencies offered on the production pages
+FREQ_MAP = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Yearly": "Y"
+}
+
+def filter_depth_range(df, depth_range, depth_column='DEPTH'):
+    """Keep the rows whose depth lies inside depth_range (inclusive)."""
+    if not depth_range:
+        return df
+    return df[(df[depth_column] >= depth_range[0]) & (df[depth_column] <= depth_range[1])]
+
+def filter_drilling_data(df, depth_range=None, formations=None):
+    """Filter drilling data by depth range and, if present, by formation."""
+    df = filter_depth_range(df, depth_range, depth_column='Depth')
+    if formations and 'Formation' in df.columns:
+        df = df[df['Formation'].isin(formations)]
+    return df
+
+def resample_production(df, freq, wells=None):
+    """Resample production to freq, summing per well when a Well_ID column exists."""
+    if 'Well_ID' not in df.columns:
+        return df.set_index('Date').resample(freq).sum(numeric_only=True).reset_index()
+
+    if wells is not None:
+        df = df[df['Well_ID'].isin(wells)]
+    if df.empty:
+        return df.reset_index(drop=True)
+
+    resampled = df.set_index('Date').groupby('Well_ID').resample(freq).sum(numeric_only=True)
+    return resampled.reset_index()
+
+def resample_production_chunks(chunks, freq, wells=None):
+    """Resample production read in chunks without holding the raw rows at once.
+
+    Each chunk is reduced to per-period sums; the partial sums are then
+    re-binned, so periods split across chunk boundaries add up correctly.
+    """
+    partials = [resample_production(chunk, freq, wells=wells) for chunk in chunks]
+    if not partials:
+        return pd.DataFrame()
+    return resample_production(pd.concat(partials, ignore_index=True), freq)
+
+def total_production(resampled_df, column):
+    """Sum a resampled production column across wells for each period."""
+    return resampled_df.groupby('Date')[column].sum().reset_index()
+
+def add_moving_average(df, column, window):
+    """Add a trailing moving average of column named '<window>-Period MA'."""
+    df[f'{window}-Period MA'] = df[column].rolling(window=window).mean()
+    return df
@@ -0,0 +1,74 @@
+import streamlit as st
+import hashlib
+import os
+import threading
+import weakref
+
+@st.cache_resource(show_spinner=False)
+def data_registry():
+    """Process-wide record of the data files found in the data directory and what was built from them.
+
+    'files' maps each path to its kind, size, mtime and prewarm status.
+    'hashes' remembers each path's content hash per size and mtime.
+    'artifacts' maps the id of a loaded frame to the indexes and rollups
+    built from it, for as long as that frame is alive, so sessions holding
+    the same shared frame can pick them up instead of rebuilding.
+    'scanned' is the time of the last directory scan.
+    """
+    return {'lock': threading.Lock(), 'files': {}, 'hashes': {}, 'artifacts': {}, 'scanned': None}
+
+def file_hash(file_path):
+    """SHA-1 of a file's bytes, read in 1 MB blocks."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_version(file_path):
+    """Content hash of a data file, the cache key of everything parsed from it.
+
+    The hash is remembered per size and mtime, so a file is read again only
+    after it changes, and one touched or rewritten with the same contents
+    keeps its key.
+    """
+    stat = os.stat(file_path)
+    hashes = data_registry()['hashes']
+    known = hashes.get(file_path)
+    if known is None or known[:2] != (stat.st_mtime_ns, stat.st_size):
+        known = hashes[file_path] = (stat.st_mtime_ns, stat.st_size, file_hash(file_path))
+    return known[2]
+
+def _drop_artifacts(artifacts, key):
+    """Forget the artifacts of a frame that was garbage collected."""
+    artifacts.pop(key, None)
+
+def register_artifacts(frame, artifacts):
+    """Keep prebuilt indexes and rollups for a loaded frame until the frame itself is collected.
+
+    Only the frame's id is held, so the registry never keeps a frame alive
+    after the loader caches have evicted it.
+    """
+    registry = data_registry()
+    with registry['lock']:
+        registry['artifacts'][id(frame)] = artifacts
+    weakref.finalize(frame, _drop_artifacts, registry['artifacts'], id(frame))
+
+def frame_artifacts(frame):
+    """Everything prebuilt for this very frame object, or None."""
+    return data_registry()['artifacts'].get(id(frame))
+
+def prebuilt(frame, key):
+    """Artifact built in the background for this very frame object, or None."""
+    artifacts = frame_artifacts(frame)
+    return artifacts.get(key) if artifacts is not None else None
+
+def registered_datasets(kind):
+    """Paths of the data files of one kind found in the data directory, sorted."""
+    files = data_registry()['files']
+    return sorted(path for path, entry in list(files.items()) if entry['kind'] == kind)
+
+def dataset_status(file_path):
+    """Prewarm status of a registered file ('pending', 'ready' or 'failed'), or None."""
+    entry = data_registry()['files'].get(file_path)
+    return entry['status'] if entry is not None else None
@@ -0,0 +1,109 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Ways of attaching one depth-indexed dataset to another
+JOIN_METHODS = {
+    "Nearest Sample": 'nearest',
+    "Interval Average": 'interval',
+}
+
+def _sorted_source(df, depth_column, columns):
+    """Depths of the source frame in ascending order with its values, dropping rows without a depth."""
+    depth = df[depth_column].to_numpy(dtype=float)
+    keep = np.isfinite(depth)
+    order = np.argsort(depth[keep], kind='stable')
+    values = df[columns].to_numpy(dtype=float)[keep][order]
+    return depth[keep][order], values
+
+def median_spacing(depth):
+    """Typical sample spacing of a depth column, ignoring repeats and gaps."""
+    depth = np.unique(depth[np.isfinite(depth)])
+    return float(np.median(np.diff(depth))) if len(depth) > 1 else 0.0
+
+def nearest_positions(target, source, tolerance=None):
+    """Position in the sorted source of the sample nearest each target depth, or -1 beyond tolerance."""
+    if len(source) == 0:
+        return np.full(len(target), -1)
+    right = np.clip(np.searchsorted(source, target, side='left'), 0, len(source) - 1)
+    left = np.clip(right - 1, 0, len(source) - 1)
+    # Ties go to the shallower sample
+    nearest = np.where(np.abs(target - source[left]) <= np.abs(source[right] - target), left, right)
+
+    distance = np.abs(source[nearest] - target)
+    miss = ~np.isfinite(target) | (distance > tolerance if tolerance is not None else False)
+    return np.where(miss, -1, nearest)
+
+def interval_edges(target, tolerance=None):
+    """Top and base of the depth interval each target sample represents.
+
+    Intervals meet halfway between neighbouring distinct target depths; the
+    first and last extend by half their neighbour's gap. Rows repeating a
+    depth share its interval. tolerance caps how far an interval reaches
+    either side of its sample.
+    """
+    valid = np.isfinite(target)
+    depth, inverse = np.unique(target[valid], return_inverse=True)
+
+    gaps = np.diff(depth)
+    if len(gaps):
+        half = np.concatenate([gaps[:1], gaps, gaps[-1:]]) / 2
+    else:
+        half = np.full(len(depth) + 1, tolerance or 0.0)
+    below, above = half[:-1], half[1:]
+    if tolerance is not None:
+        below, above = np.minimum(below, tolerance), np.minimum(above, tolerance)
+
+    top = np.full(len(target), np.nan)
+    base = np.full(len(target), np.nan)
+    top[valid] = (depth - below)[inverse]
+    base[valid] = (depth + above)[inverse]
+    return top, base
+
+def interval_means(target, source, values, tolerance=None):
+    """Mean of the source samples inside each target sample's interval, from prefix sums over depth."""
+    top, base = interval_edges(target, tolerance)
+    valid = np.isfinite(top)
+    lo = np.searchsorted(source, np.where(valid, top, 0.0), side='left')
+    hi = np.searchsorted(source, np.where(valid, base, 0.0), side='left')
+
+    present = np.isfinite(values)
+    sums = np.zeros((len(source) + 1, values.shape[1]))
+    counts = np.zeros((len(source) + 1, values.shape[1]))
+    np.cumsum(np.where(present, values, 0.0), axis=0, out=sums[1:])
+    np.cumsum(present, axis=0, out=counts[1:])
+
+    n = counts[hi] - counts[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums[hi] - sums[lo]) / n
+    means[(n == 0) | ~valid[:, None]] = np.nan
+    return means
+
+@st.cache_data(show_spinner=False)
+def depth_join(target_df, source_df, target_depth, source_depth, columns, method='nearest', tolerance=None,
+               suffix='_src'):
+    """Attach source curves to every row of target_df by depth.
+
+    'nearest' takes the closest source sample within tolerance (default:
+    the source's sample spacing), like merge_asof with direction='nearest'.
+    'interval' averages the source samples inside the depth interval each
+    target row represents. Target rows keep their order; columns already in
+    target_df get suffix.
+    """
+    columns = [col for col in columns if col in source_df.columns and col != source_depth]
+    source, values = _sorted_source(source_df, source_depth, columns)
+    target = target_df[target_depth].to_numpy(dtype=float)
+
+    if method == 'interval':
+        joined = interval_means(target, source, values, tolerance)
+    else:
+        if tolerance is None:
+            tolerance = median_spacing(source)
+        positions = nearest_positions(target, source, tolerance)
+        joined = values[np.maximum(positions, 0)] if len(source) else np.full((len(target), len(columns)), np.nan)
+        joined[positions < 0] = np.nan
+
+    result = target_df.copy()
+    for i, col in enumerate(columns):
+        result[col + suffix if col in result.columns else col] = joined[:, i]
+    return result
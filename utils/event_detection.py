@@ -0,0 +1,210 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Drilling channels monitored for dysfunctions
+DRILLING_CHANNELS = ['ROP', 'WOB', 'RPM', 'Torque', 'MSE']
+
+EVENT_DEFAULTS = {
+    'window': 30,           # samples in the rolling baseline
+    'z_threshold': 3.0,     # |z| above which a sample is anomalous
+    'steady_z': 1.0,        # |z| below which WOB counts as constant
+    'stick_slip_cv': 0.3,   # torque coefficient of variation flagging stick-slip
+    'cusum_k': 0.5,         # CUSUM slack, in standard deviations
+    'cusum_h': 5.0,         # CUSUM alarm level, in standard deviations
+}
+
+EVENT_COLUMNS = ['Row', 'Depth', 'Timestamp', 'Event', 'Channel', 'Value', 'Z']
+
+def _zscore(values, mean, std):
+    """Z-score against a baseline; a flat baseline gives 0 when equal and +/-inf otherwise."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - mean) / std
+    return np.where(np.isnan(z) & ~np.isnan(mean), 0.0, z)
+
+def _classify(rows, values, mean, std, z, cusum_alarm, channels, state):
+    """Turn per-sample statistics into event records."""
+    params = state['params']
+    events = []
+    col = {channel: i for i, channel in enumerate(channels)}
+    threshold = params['z_threshold']
+
+    def add(mask, event, channel):
+        i = col[channel]
+        for k in np.flatnonzero(mask):
+            events.append((rows[k], event, channel, values[k, i], z[k, i]))
+
+    if 'Torque' in col:
+        i = col['Torque']
+        add(z[:, i] > threshold, 'Torque Spike', 'Torque')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = std[:, i] / np.abs(mean[:, i])
+        # Stick-slip is a regime; report only the samples where it starts
+        stick_slip = cv > params['stick_slip_cv']
+        previous = np.concatenate([[state['stick_slip']], stick_slip[:-1]])
+        add(stick_slip & ~previous, 'Stick-Slip', 'Torque')
+        if len(stick_slip):
+            state['stick_slip'] = bool(stick_slip[-1])
+
+    if 'ROP' in col:
+        rop_drop = z[:, col['ROP']] < -threshold
+        if 'WOB' in col:
+            rop_drop &= np.abs(z[:, col['WOB']]) < params['steady_z']
+        add(rop_drop, 'ROP Drop', 'ROP')
+
+    if 'MSE' in col:
+        add(cusum_alarm, 'MSE Jump', 'MSE')
+
+    return events
+
+def _cusum(z, state, params):
+    """Upward CUSUM over z-scores; returns the alarm mask and updates state in place."""
+    alarms = np.zeros(len(z), dtype=bool)
+    k, h = params['cusum_k'], params['cusum_h']
+    s = state['cusum']
+    for n, value in enumerate(z):
+        if not np.isfinite(value):
+            value = h if value > 0 else 0.0
+        s = max(0.0, s + value - k)
+        if s > h:
+            alarms[n] = True
+            s = 0.0
+    state['cusum'] = s
+    return alarms
+
+def _events_frame(df, events, row_offset=0):
+    """Build the event table with depth and time looked up from the source rows."""
+    events_df = pd.DataFrame(events, columns=['Row', 'Event', 'Channel', 'Value', 'Z'])
+    positions = events_df['Row'].to_numpy(dtype=int) - row_offset
+    events_df['Depth'] = df['Depth'].to_numpy()[positions] if 'Depth' in df.columns else np.nan
+    events_df['Timestamp'] = df['Timestamp'].to_numpy()[positions] if 'Timestamp' in df.columns else pd.NaT
+    return events_df[EVENT_COLUMNS].sort_values(['Row', 'Event']).reset_index(drop=True)
+
+def init_detector_state(channels, params=None):
+    """Create an empty incremental detector state for the given channels."""
+    params = {**EVENT_DEFAULTS, **(params or {})}
+    window = params['window']
+    return {
+        'params': params,
+        'channels': list(channels),
+        'buffer': np.zeros((window, len(channels))),
+        'count': 0,
+        'pos': 0,
+        'sum': np.zeros(len(channels)),
+        'sumsq': np.zeros(len(channels)),
+        'cusum': 0.0,
+        'stick_slip': False,
+        'rows': 0,
+    }
+
+def _baseline(state):
+    """Mean and population std of the samples currently in the window."""
+    n = min(state['count'], state['params']['window'])
+    if n < state['params']['window']:
+        nan = np.full(len(state['channels']), np.nan)
+        return nan, nan
+    mean = state['sum'] / n
+    std = np.sqrt(np.maximum(state['sumsq'] / n - mean ** 2, 0.0))
+    return mean, std
+
+def update_detector(state, df):
+    """Feed appended rows through the detector in O(1) work per sample and channel.
+
+    Row numbers in the returned events continue from the rows already seen.
+    """
+    params = state['params']
+    channels = state['channels']
+    window = params['window']
+    values = df[channels].to_numpy(dtype=float)
+    # Samples with a missing channel are skipped but still count as rows
+    valid = ~np.isnan(values).any(axis=1)
+
+    n = len(values)
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+    z = np.full(values.shape, np.nan)
+
+    for k in np.flatnonzero(valid):
+        mean[k], std[k] = _baseline(state)
+        z[k] = _zscore(values[k], mean[k], std[k])
+
+        # Slide the window: drop the oldest sample once full, add the new one
+        x = values[k]
+        if state['count'] >= window:
+            old = state['buffer'][state['pos']]
+            state['sum'] -= old
+            state['sumsq'] -= old ** 2
+        state['buffer'][state['pos']] = x
+        state['sum'] += x
+        state['sumsq'] += x ** 2
+        state['pos'] = (state['pos'] + 1) % window
+        state['count'] += 1
+
+    values, mean, std, z = values[valid], mean[valid], std[valid], z[valid]
+    alarms = np.zeros(len(values), dtype=bool)
+    if 'MSE' in channels:
+        alarms = _cusum(z[:, channels.index('MSE')], state, params)
+
+    rows = state['rows'] + np.flatnonzero(valid)
+    events = _classify(rows, values, mean, std, z, alarms, channels, state)
+    events_df = _events_frame(df, events, row_offset=state['rows'])
+    state['rows'] += n
+    return events_df
+
+@st.cache_data
+def detect_drilling_events(df, params=None):
+    """Detect drilling dysfunctions over a whole dataset with vectorized rolling statistics.
+
+    Returns the event table and a detector state positioned after the last
+    row, so appended rows can continue with update_detector.
+    """
+    params = {**EVENT_DEFAULTS, **(params or {})}
+    channels = [channel for channel in DRILLING_CHANNELS if channel in df.columns]
+    state = init_detector_state(channels, params)
+    if not channels:
+        return pd.DataFrame(columns=EVENT_COLUMNS), state
+
+    window = params['window']
+    all_values = df[channels].to_numpy(dtype=float)
+    valid = ~np.isnan(all_values).any(axis=1)
+    values = all_values[valid]
+
+    # Baseline of the previous `window` samples, excluding the current one
+    frame = pd.DataFrame(values)
+    mean = frame.rolling(window, min_periods=window).mean().shift(1).to_numpy()
+    std = frame.rolling(window, min_periods=window).std(ddof=0).shift(1).to_numpy()
+    z = _zscore(values, mean, std)
+
+    alarms = np.zeros(len(values), dtype=bool)
+    if 'MSE' in channels:
+        alarms = _cusum(z[:, channels.index('MSE')], state, params)
+
+    rows = np.flatnonzero(valid)
+    events = _classify(rows, values, mean, std, z, alarms, channels, state)
+
+    # Leave the state holding the last window of samples, oldest first
+    tail = values[-window:]
+    state['buffer'][:len(tail)] = tail
+    state['count'] = len(values)
+    state['pos'] = len(tail) % window
+    state['sum'] = tail.sum(axis=0)
+    state['sumsq'] = (tail ** 2).sum(axis=0)
+    state['rows'] = len(df)
+
+    return _events_frame(df, events), state
+
+def session_drilling_events(df, dataset_version, params=None):
+    """Detect events for the session's drilling data, processing only rows appended since the last run."""
+    params = {**EVENT_DEFAULTS, **(params or {})}
+    previous = st.session_state.drilling_events
+
+    if (previous is not None and previous['version'] == dataset_version
+            and previous['state']['params'] == params and previous['state']['rows'] <= len(df)):
+        if previous['state']['rows'] < len(df):
+            appended = update_detector(previous['state'], df.iloc[previous['state']['rows']:])
+            previous['events'] = pd.concat([previous['events'], appended], ignore_index=True)
+        return previous['events']
+
+    events, state = detect_drilling_events(df, params)
+    st.session_state.drilling_events = {'version': dataset_version, 'state': state, 'events': events}
+    return events
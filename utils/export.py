@@ -0,0 +1,169 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import tempfile
+import os
+from utils.data_loader import open_data_file
+
+# Rows handled per step of an export; bounds the memory used while writing
+EXPORT_CHUNK_ROWS = 100_000
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/octet-stream"),
+    "LAS": ("las", "text/plain"),
+}
+
+def iter_frame_chunks(df, chunksize=EXPORT_CHUNK_ROWS):
+    """Yield consecutive row slices of an in-memory DataFrame."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def iter_csv_chunks(file_path, prepare=None, chunksize=EXPORT_CHUNK_ROWS):
+    """Yield chunks of a CSV file (path or uploaded file, optionally compressed), applying prepare to each."""
+    with open_data_file(file_path) as stream:
+        for chunk in pd.read_csv(stream, chunksize=chunksize):
+            yield prepare(chunk) if prepare else chunk
+
+def _write_csv(chunks, out):
+    """Write chunks as one CSV, emitting the header only once."""
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(out, header=header, index=False)
+        header = False
+
+def _parquet_schema(table):
+    """Widen a chunk's schema so every later chunk fits it.
+
+    Integer columns become float64, since a later chunk may carry NaN in
+    them, and all-null columns become strings.
+    """
+    fields = []
+    for field in table.schema:
+        if pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+def _write_parquet(chunks, out):
+    """Write each non-empty chunk as a row group of one Parquet file.
+
+    The schema comes from the first non-empty chunk, widened so later
+    chunks are cast to it without loss. With no rows at all the file holds
+    just the schema of the last chunk.
+    """
+    writer = None
+    table = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if len(chunk) == 0:
+                # Filtered-out chunks carry no types for object columns
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(out, _parquet_schema(table))
+            writer.write_table(table.cast(writer.schema))
+        if writer is None and table is not None:
+            writer = pq.ParquetWriter(out, _parquet_schema(table))
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _write_las(chunks, out, depth_column='DEPTH', las=None, depth_bounds=None, null_value=-999.25):
+    """Write chunks as a LAS 2.0 file, streaming the ~ASCII section."""
+    first = True
+    for chunk in chunks:
+        if first:
+            curves = [depth_column] + [col for col in chunk.columns if col != depth_column]
+            out.write(_las_header(curves, las, depth_bounds, null_value).encode("ascii", "replace"))
+            first = False
+
+        values = chunk[curves].to_numpy(dtype=float)
+        values = np.where(np.isnan(values), null_value, values)
+        np.savetxt(out, values, fmt='%12.5f')
+
+def _las_header(curves, las, depth_bounds, null_value):
+    """Build the LAS header sections for the exported curves."""
+    units = {}
+    descriptions = {}
+    if las is not None:
+        for curve in las.curves:
+            units[curve.mnemonic] = curve.unit
+            descriptions[curve.mnemonic] = curve.descr
+
+    depth_unit = units.get(curves[0], "M")
+    start, stop = depth_bounds if depth_bounds else (np.nan, np.nan)
+
+    lines = [
+        "~Version ---------------------------------------------------",
+        "VERS.   2.0 : CWLS log ASCII Standard -VERSION 2.0",
+        "WRAP.    NO : One line per depth step",
+        "~Well ------------------------------------------------------",
+        f"STRT.{depth_unit} {start:12.5f} : Start depth",
+        f"STOP.{depth_unit} {stop:12.5f} : Stop depth",
+        f"STEP.{depth_unit} {0.0:12.5f} : Step",
+        f"NULL. {null_value} : Null value",
+    ]
+
+    if las is not None:
+        for item in las.well:
+            if item.mnemonic not in ("STRT", "STOP", "STEP", "NULL"):
+                lines.append(f"{item.mnemonic}.{item.unit} {item.value} : {item.descr}")
+
+    lines.append("~Curve Information -----------------------------------------")
+    for curve in curves:
+        lines.append(f"{curve}.{units.get(curve, '')} : {descriptions.get(curve, '')}")
+
+    lines.append("~ASCII -----------------------------------------------------")
+    return "\n".join(lines) + "\n"
+
+def write_export(chunks, export_format, **las_options):
+    """Stream chunks into a temporary file in export_format and return its path."""
+    extension, _ = EXPORT_FORMATS[export_format]
+    handle, path = tempfile.mkstemp(suffix=f".{extension}")
+
+    try:
+        with os.fdopen(handle, "wb") as out:
+            if export_format == "CSV":
+                _write_csv(chunks, out)
+            elif export_format == "Parquet":
+                _write_parquet(chunks, out)
+            else:
+                _write_las(chunks, out, **las_options)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return path
+
+def export_download(make_chunks, file_name, formats=("CSV", "Parquet"), key="export", **las_options):
+    """Render export controls that stream make_chunks() to a file offered as a download."""
+    col1, col2 = st.columns(2)
+
+    with col1:
+        export_format = st.selectbox("Export Format", list(formats), key=f"{key}_format")
+
+    with col2:
+        prepare = st.button("Prepare Export", key=f"{key}_prepare")
+
+    if prepare:
+        extension, mime = EXPORT_FORMATS[export_format]
+        try:
+            with st.spinner("Exporting..."):
+                path = write_export(make_chunks(), export_format, **las_options)
+        except Exception as e:
+            st.error(f"Error exporting data: {e}")
+            return
+
+        try:
+            with open(path, "rb") as f:
+                st.download_button("Download Export", data=f, file_name=f"{file_name}.{extension}",
+                                   mime=mime, key=f"{key}_download")
+        finally:
+            os.remove(path)
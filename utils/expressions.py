@@ -0,0 +1,177 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import ast
+import re
+
+# Operators and functions an expression may use; everything else is rejected
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+}
+
+_UNARY_OPS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+# Function name -> (ufunc, number of arguments)
+_FUNCTIONS = {
+    'abs': (np.abs, 1),
+    'sqrt': (np.sqrt, 1),
+    'exp': (np.exp, 1),
+    'log': (np.log, 1),
+    'log10': (np.log10, 1),
+    'min': (np.fmin, 2),
+    'max': (np.fmax, 2),
+}
+
+# Column names that are not identifiers can be written in backticks: `Oil (bbl)`
+_QUOTED_NAME = re.compile(r'`([^`]+)`')
+
+def _compile_node(node, names):
+    """Turn one AST node into a function of the column arrays."""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, names)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left = _compile_node(node.left, names)
+        right = _compile_node(node.right, names)
+        return lambda columns: op(left(columns), right(columns))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand, names)
+        return lambda columns: op(operand(columns))
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return lambda columns: value
+
+    if isinstance(node, ast.Name):
+        if node.id in _FUNCTIONS:
+            raise ValueError(f"'{node.id}' is a function; call it as {node.id}(...) "
+                             f"or write a column of that name in backticks")
+        column = names.get(node.id, node.id)
+        return lambda columns: columns[column]
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS and not node.keywords):
+        func, n_args = _FUNCTIONS[node.func.id]
+        if len(node.args) != n_args:
+            raise ValueError(f"{node.func.id}() takes {n_args} argument{'s' if n_args > 1 else ''}, "
+                             f"got {len(node.args)}")
+        args = [_compile_node(arg, names) for arg in node.args]
+        return lambda columns: func(*(arg(columns) for arg in args))
+
+    raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+@st.cache_resource(show_spinner=False)
+def compile_expression(expression):
+    """Parse a safe arithmetic expression over columns into a vectorized function.
+
+    Returns the compiled function and the column names it reads.
+    """
+    names = {}
+
+    def quote(match):
+        placeholder = f"__column_{len(names)}__"
+        names[placeholder] = match.group(1)
+        return placeholder
+
+    try:
+        tree = ast.parse(_QUOTED_NAME.sub(quote, expression), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from e
+
+    func = _compile_node(tree, names)
+    columns = sorted({names.get(node.id, node.id) for node in ast.walk(tree)
+                      if isinstance(node, ast.Name) and node.id not in _FUNCTIONS})
+    return func, columns
+
+def evaluate_expression(df, expression):
+    """Evaluate an expression against a DataFrame's columns as whole arrays."""
+    func, columns = compile_expression(expression)
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown column(s): {', '.join(missing)}")
+
+    arrays = {col: df[col].to_numpy(dtype=float) for col in columns}
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        result = np.broadcast_to(func(arrays), (len(df),)).astype(float)
+
+    # Division by zero and similar produce inf; treat those samples as missing
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+def assign_expressions(df, expressions):
+    """Return df with one column per named expression, without caching (for chunked exports)."""
+    for name, expression in expressions.items():
+        df = df.assign(**{name: evaluate_expression(df, expression)})
+    return df
+
+def add_derived_columns(df, expressions, dataset, data_key):
+    """Return df with one column per named expression, reporting any that fail.
+
+    Results are kept in the session per dataset and reused while data_key
+    (the dataset version plus whatever else shaped df) stays the same.
+    """
+    if not expressions:
+        return df
+
+    cache = st.session_state.derived_values
+    key = (data_key, len(df))
+    if dataset not in cache or cache[dataset]['key'] != key:
+        cache[dataset] = {'key': key, 'values': {}}
+    values = cache[dataset]['values']
+
+    derived = {}
+    earlier = ()
+    for name, expression in expressions.items():
+        try:
+            # Earlier derived columns may be referenced by later ones
+            if (expression, earlier) not in values:
+                values[(expression, earlier)] = evaluate_expression(df.assign(**derived), expression)
+            derived[name] = values[(expression, earlier)]
+            earlier += ((name, expression),)
+        except (ValueError, KeyError, TypeError) as e:
+            st.error(f"Error computing derived column '{name}': {e}")
+
+    return df.assign(**derived)
+
+def derived_column_controls(dataset, columns):
+    """Render sidebar controls to add and remove derived columns for a dataset."""
+    expressions = st.session_state.derived_columns[dataset]
+
+    st.sidebar.header("Derived Columns")
+    name = st.sidebar.text_input("Column Name", key=f"{dataset}_derived_name")
+    expression = st.sidebar.text_input("Expression", key=f"{dataset}_derived_expression",
+                                       help="Arithmetic over columns, e.g. Oil/(Oil+Water) or log(RT). "
+                                            "Wrap names with spaces in backticks.")
+
+    if st.sidebar.button("Add Column", key=f"{dataset}_derived_add"):
+        if not name or not expression:
+            st.sidebar.error("Enter both a column name and an expression.")
+        elif name in columns:
+            st.sidebar.error(f"A column named '{name}' already exists.")
+        else:
+            try:
+                compile_expression(expression)
+                expressions[name] = expression
+            except ValueError as e:
+                st.sidebar.error(str(e))
+
+    for existing_name, existing_expression in list(expressions.items()):
+        col1, col2 = st.sidebar.columns([4, 1])
+        col1.write(f"**{existing_name}** = `{existing_expression}`")
+        if col2.button("✕", key=f"{dataset}_derived_remove_{existing_name}"):
+            del expressions[existing_name]
+            st.rerun()
+
+    return dict(expressions)
@@ -0,0 +1,127 @@
+import streamlit as st
+import plotly.io as pio
+import plotly.graph_objects as go
+import numpy as np
+import time
+
+# Trace arrays shorter than this are left as they are
+MIN_COMPACT_POINTS = 100
+
+# Distinct levels kept across an array's range; well beyond the pixels of any axis
+AXIS_LEVELS = 2 ** 16
+
+# Data attributes rewritten in each trace
+COMPACT_ATTRIBUTES = [('x',), ('y',), ('z',), ('marker', 'color')]
+
+# Trace types that can replace an evenly spaced x or y array with a start and step (x0/dx, y0/dy)
+STEPPED_TRACES = {'scatter', 'scattergl'}
+
+def _numeric_array(values):
+    """Return values as a float array when they are a long enough numeric sequence, else None."""
+    if values is None or isinstance(values, (str, dict)):
+        return None
+    try:
+        array = np.asarray(values)
+    except (TypeError, ValueError):
+        return None
+    if array.dtype.kind not in 'iuf' or array.ndim != 1 or array.size < MIN_COMPACT_POINTS:
+        return None
+    return array.astype(np.float64, copy=False)
+
+def _resolution(array):
+    """Smallest difference the chart needs to show for an array, or None when it has no finite values."""
+    finite = array[np.isfinite(array)]
+    if finite.size == 0:
+        return None
+    span = float(finite.max() - finite.min())
+    scale = float(np.abs(finite).max())
+    return (span or scale or 1.0) / AXIS_LEVELS
+
+def compact_array(values):
+    """Round one trace array to the precision its chart can show, so its JSON text is short.
+
+    Returns None when nothing applies.
+    """
+    array = _numeric_array(values)
+    if array is None:
+        return None
+    step = _resolution(array)
+    if step is None:
+        return None
+    decimals = max(0, int(-np.floor(np.log10(step))))
+    return np.round(array, decimals)
+
+def _even_step(values):
+    """Return (start, step) when values are evenly spaced to within chart resolution, else None."""
+    array = _numeric_array(values)
+    if array is None or not np.isfinite(array).all():
+        return None
+    step = (array[-1] - array[0]) / (len(array) - 1)
+    expected = array[0] + step * np.arange(len(array))
+    if step == 0 or np.abs(array - expected).max() > _resolution(array):
+        return None
+    return float(array[0]), float(step)
+
+def _attribute_owner(trace, path):
+    """Return the object holding the last attribute of path, or None when the trace type lacks it."""
+    owner = trace
+    for name in path[:-1]:
+        if name not in owner:
+            return None
+        owner = owner[name]
+    return owner if path[-1] in owner else None
+
+def compact_figure(fig):
+    """Rewrite a figure's long numeric trace arrays into compact payloads, in place."""
+    for trace in fig.data:
+        # Regularly sampled axes such as LAS depth need only their start and step
+        if trace.type in STEPPED_TRACES:
+            for axis in ('x', 'y'):
+                stepped = _even_step(trace[axis])
+                if stepped is not None:
+                    trace[axis] = None
+                    trace[f'{axis}0'], trace[f'd{axis}'] = stepped
+
+        for path in COMPACT_ATTRIBUTES:
+            owner = _attribute_owner(trace, path)
+            if owner is None:
+                continue
+            compact = compact_array(owner[path[-1]])
+            if compact is not None:
+                owner[path[-1]] = compact
+    return fig
+
+def payload_report(fig):
+    """Compare a figure's JSON payload size and encoding time with and without compaction."""
+    start = time.perf_counter()
+    plain = pio.to_json(fig, validate=False)
+    plain_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    compact = pio.to_json(compact_figure(go.Figure(fig)), validate=False)
+    compact_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'plain_bytes': len(plain),
+        'compact_bytes': len(compact),
+        'ratio': len(plain) / max(len(compact), 1),
+        'plain_ms': plain_ms,
+        'compact_ms': compact_ms,
+    }
+
+def payload_expander(fig, key):
+    """Expander that measures, on request, what compaction saves for a figure.
+
+    Call it before compact_figure, which rewrites the figure in place. Time
+    to first render happens in the browser and is not visible here; the
+    payload size is what drives it.
+    """
+    with st.expander("Chart Payload"):
+        if st.button("Measure Payload", key=key):
+            report = payload_report(fig)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Plain JSON", f"{report['plain_bytes'] / 1024:,.0f} KB", f"{report['plain_ms']:.0f} ms",
+                        delta_color="off")
+            col2.metric("Compact JSON", f"{report['compact_bytes'] / 1024:,.0f} KB", f"{report['compact_ms']:.0f} ms",
+                        delta_color="off")
+            col3.metric("Reduction", f"{report['ratio']:.1f}x")
@@ -0,0 +1,186 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Memory allowed for one block of (realizations x wells x periods) rates
+FORECAST_MEMORY_BUDGET_MB = 256
+
+# Minimum positive periods a well needs for a meaningful decline fit
+MIN_FIT_POINTS = 6
+
+# EUR runs to the economic limit, but never further than this past the last history period
+EUR_HORIZON_YEARS = 50
+
+def production_matrix(resampled_df, column):
+    """Pivot resampled production into a (wells x periods) rate matrix."""
+    if 'Well_ID' in resampled_df.columns:
+        pivot = resampled_df.pivot_table(index='Well_ID', columns='Date', values=column, aggfunc='sum')
+    else:
+        pivot = resampled_df.set_index('Date')[[column]].T
+        pivot.index = ['Field']
+    return pivot
+
+def fit_exponential_decline(rates, days):
+    """Fit ln(q) = a + b*t for every well at once, ignoring non-positive rates.
+
+    Returns the intercepts, slopes and their (co)variances per well, along
+    with a mask of wells that had enough points to be fitted.
+    """
+    valid = rates > 0
+    n = valid.sum(axis=1)
+    fitted = n >= MIN_FIT_POINTS
+    n_safe = np.where(fitted, n, 1)
+
+    log_q = np.where(valid, np.log(np.where(valid, rates, 1.0)), 0.0)
+    t = np.where(valid, days[None, :], 0.0)
+
+    t_mean = t.sum(axis=1) / n_safe
+    y_mean = log_q.sum(axis=1) / n_safe
+    dt = np.where(valid, days[None, :] - t_mean[:, None], 0.0)
+    dy = np.where(valid, log_q - y_mean[:, None], 0.0)
+
+    sxx = (dt ** 2).sum(axis=1)
+    sxx_safe = np.where(sxx > 0, sxx, 1.0)
+    fitted &= sxx > 0
+
+    slope = (dt * dy).sum(axis=1) / sxx_safe
+    intercept = y_mean - slope * t_mean
+
+    # Residual variance and the usual OLS parameter covariance
+    residuals = np.where(valid, dy - slope[:, None] * dt, 0.0)
+    s2 = (residuals ** 2).sum(axis=1) / np.maximum(n - 2, 1)
+    var_slope = s2 / sxx_safe
+    var_intercept = s2 * (1.0 / n_safe + t_mean ** 2 / sxx_safe)
+    covariance = -t_mean * s2 / sxx_safe
+
+    return {
+        'intercept': np.where(fitted, intercept, -np.inf),
+        'slope': np.where(fitted, slope, 0.0),
+        'var_intercept': np.where(fitted, var_intercept, 0.0),
+        'var_slope': np.where(fitted, var_slope, 0.0),
+        'covariance': np.where(fitted, covariance, 0.0),
+        'fitted': fitted,
+        'cumulative': np.nansum(rates, axis=1),
+    }
+
+def _sample_decline_parameters(fit, size, rng):
+    """Draw correlated (intercept, slope) pairs per well from the fit uncertainty."""
+    n_wells = len(fit['slope'])
+    z1 = rng.standard_normal((size, n_wells))
+    z2 = rng.standard_normal((size, n_wells))
+
+    # Two-variable Cholesky factor of each well's parameter covariance
+    sd_slope = np.sqrt(fit['var_slope'])
+    loading = np.divide(fit['covariance'], sd_slope, out=np.zeros_like(sd_slope), where=sd_slope > 0)
+    residual_sd = np.sqrt(np.maximum(fit['var_intercept'] - loading ** 2, 0.0))
+
+    slope = fit['slope'] + sd_slope * z1
+    intercept = fit['intercept'] + loading * z1 + residual_sd * z2
+
+    # A sampled incline would forecast unbounded growth; hold it flat instead
+    return intercept, np.minimum(slope, 0.0)
+
+def remaining_volume(intercept, slope, start_day, period_days, economic_limit=0.0, max_periods=np.inf):
+    """Total of the per-period volumes after start_day until they fall below the economic limit.
+
+    Under exponential decline each period's volume is a fixed fraction of
+    the previous one, so the total is a geometric series, capped at
+    max_periods; flat declines run for max_periods.
+    """
+    first = np.exp(intercept + slope * (start_day + period_days))
+    log_ratio = slope * period_days
+    declining = log_ratio < 0
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if economic_limit > 0:
+            to_limit = np.floor(np.log(economic_limit / first) / np.where(declining, log_ratio, -1.0)) + 1
+        else:
+            to_limit = np.full_like(first, np.inf)
+        periods = np.where(first < economic_limit, 0.0,
+                           np.where(declining, np.minimum(to_limit, max_periods), max_periods))
+        total = np.where(declining, first * np.expm1(log_ratio * periods) / np.expm1(log_ratio), first * periods)
+    return np.nan_to_num(total)
+
+def monte_carlo_forecast(fit, forecast_days, n_realizations=1000, economic_limit=0.0,
+                         memory_budget_mb=FORECAST_MEMORY_BUDGET_MB, seed=None, history_end=None, period_days=None):
+    """Evaluate decline realizations for all wells as blocked array operations.
+
+    Returns the field total rate per realization and period and the EUR per
+    realization and well: history plus every future period down to the
+    economic limit (at most EUR_HORIZON_YEARS), independent of how many
+    forecast periods are evaluated. Periods are period_days long and start
+    after history_end, by default the spacing of forecast_days.
+    """
+    rng = np.random.default_rng(seed)
+    n_wells = len(fit['slope'])
+    n_periods = len(forecast_days)
+    if period_days is None:
+        period_days = float(np.mean(np.diff(forecast_days))) if n_periods > 1 else 1.0
+    if history_end is None:
+        history_end = forecast_days[0] - period_days if n_periods else 0.0
+    max_periods = np.ceil(EUR_HORIZON_YEARS * 365.25 / period_days)
+
+    # Size each block of realizations to the memory budget
+    bytes_per_realization = 8 * max(n_wells * n_periods, 1)
+    block = max(1, int(memory_budget_mb * 2 ** 20 // bytes_per_realization))
+
+    field_rates = np.empty((n_realizations, n_periods))
+    eur = np.empty((n_realizations, n_wells), dtype=np.float32)
+
+    for start in range(0, n_realizations, block):
+        stop = min(start + block, n_realizations)
+        intercept, slope = _sample_decline_parameters(fit, stop - start, rng)
+
+        rates = np.exp(intercept[:, :, None] + slope[:, :, None] * forecast_days[None, None, :])
+        rates[rates < economic_limit] = 0.0
+
+        field_rates[start:stop] = rates.sum(axis=1)
+        eur[start:stop] = remaining_volume(intercept, slope, history_end, period_days,
+                                           economic_limit, max_periods) + fit['cumulative']
+
+    return field_rates, eur
+
+def percentile_bands(samples, axis=0):
+    """Reduce samples to P10/P50/P90 using the reserves convention (P90 is the low case)."""
+    high, mid, low = np.percentile(samples, [90, 50, 10], axis=axis)
+    return {'P10': high, 'P50': mid, 'P90': low}
+
+@st.cache_data
+def probabilistic_forecast(resampled_df, column, freq, forecast_periods, n_realizations=1000,
+                           economic_limit=0.0, seed=0):
+    """Run a probabilistic decline forecast for every well in a resampled frame.
+
+    Returns the forecast dates, the P10/P50/P90 field rate bands over
+    forecast_periods and a per-well EUR table, whose EUR runs to the
+    economic limit whatever forecast_periods is.
+    """
+    matrix = production_matrix(resampled_df, column)
+    dates = pd.DatetimeIndex(matrix.columns)
+    rates = matrix.to_numpy(dtype=float)
+
+    # Time in days since the first period, shared by all wells
+    days = (dates - dates[0]).days.to_numpy(dtype=float)
+    forecast_dates = pd.date_range(dates[-1], periods=forecast_periods + 1, freq=freq)[1:]
+    forecast_days = (forecast_dates - dates[0]).days.to_numpy(dtype=float)
+
+    fit = fit_exponential_decline(rates, days)
+    # EUR periods take the history's average spacing, so they do not depend on the forecast length
+    period_days = float(np.mean(np.diff(days))) if len(days) > 1 else 1.0
+    field_rates, eur = monte_carlo_forecast(fit, forecast_days, n_realizations, economic_limit=economic_limit,
+                                            seed=seed, history_end=days[-1], period_days=period_days)
+
+    eur_bands = percentile_bands(eur)
+    eur_table = pd.DataFrame({
+        'Well_ID': matrix.index,
+        'Fitted': fit['fitted'],
+        'Cumulative': fit['cumulative'],
+        'EUR P90': eur_bands['P90'],
+        'EUR P50': eur_bands['P50'],
+        'EUR P10': eur_bands['P10'],
+    })
+
+    return {
+        'dates': forecast_dates,
+        'bands': percentile_bands(field_rates),
+        'eur': eur_table,
+    }
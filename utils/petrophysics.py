@@ -0,0 +1,132 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Default interpretation parameters; GR endpoints of None use the well's P5/P95
+PETRO_DEFAULTS = {
+    'gr_clean': None,
+    'gr_shale': None,
+    'vsh_method': 'Linear',
+    'rho_matrix': 2.65,
+    'rho_fluid': 1.0,
+    'rw': 0.05,
+    'archie_a': 1.0,
+    'archie_m': 2.0,
+    'archie_n': 2.0,
+    'vsh_cutoff': 0.4,
+    'phi_cutoff': 0.08,
+    'sw_cutoff': 0.6,
+}
+
+VSH_METHODS = ['Linear', 'Larionov Tertiary', 'Larionov Older']
+
+# Derived curve -> (input curves, parameters it depends on), in dependency order
+CURVE_SPECS = {
+    'VSH': (('GR',), ('gr_clean', 'gr_shale', 'vsh_method')),
+    'PHID': (('RHOB',), ('rho_matrix', 'rho_fluid')),
+    'PHIT': (('PHID', 'NPHI'), ()),
+    'PHIE': (('PHIT', 'VSH'), ()),
+    'SW': (('RT', 'PHIT'), ('rw', 'archie_a', 'archie_m', 'archie_n')),
+    'PAY': (('VSH', 'PHIE', 'SW'), ('vsh_cutoff', 'phi_cutoff', 'sw_cutoff')),
+}
+
+def vshale(gr, gr_clean=None, gr_shale=None, method='Linear'):
+    """Shale volume from gamma ray using the linear index or a Larionov correction."""
+    if gr_clean is None:
+        gr_clean = np.nanpercentile(gr, 5)
+    if gr_shale is None:
+        gr_shale = np.nanpercentile(gr, 95)
+
+    igr = np.clip((gr - gr_clean) / np.maximum(gr_shale - gr_clean, 1e-6), 0.0, 1.0)
+    if method == 'Larionov Tertiary':
+        return 0.083 * (2.0 ** (3.7 * igr) - 1.0)
+    if method == 'Larionov Older':
+        return 0.33 * (2.0 ** (2.0 * igr) - 1.0)
+    return igr
+
+def density_porosity(rhob, rho_matrix=2.65, rho_fluid=1.0):
+    """Porosity from bulk density."""
+    return np.clip((rho_matrix - rhob) / (rho_matrix - rho_fluid), 0.0, 1.0)
+
+def neutron_density_porosity(phid, nphi):
+    """Total porosity as the root-mean-square of density and neutron porosity."""
+    return np.sqrt((phid ** 2 + nphi ** 2) / 2.0)
+
+def effective_porosity(phit, vsh):
+    """Total porosity corrected for shale volume."""
+    return phit * (1.0 - vsh)
+
+def archie_sw(rt, phi, rw=0.05, a=1.0, m=2.0, n=2.0):
+    """Water saturation from Archie's equation."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sw = ((a * rw) / (phi ** m * rt)) ** (1.0 / n)
+    return np.clip(sw, 0.0, 1.0)
+
+def pay_flag(vsh, phie, sw, vsh_cutoff=0.4, phi_cutoff=0.08, sw_cutoff=0.6):
+    """Flag samples passing the shale, porosity and saturation cutoffs (1.0 = pay)."""
+    pay = (vsh <= vsh_cutoff) & (phie >= phi_cutoff) & (sw <= sw_cutoff)
+    return np.where(np.isnan(vsh) | np.isnan(phie) | np.isnan(sw), np.nan, pay.astype(float))
+
+def _compute_curve(curve, inputs, params):
+    """Compute one derived curve from its input arrays and parameters."""
+    if curve == 'VSH':
+        return vshale(inputs[0], params['gr_clean'], params['gr_shale'], params['vsh_method'])
+    if curve == 'PHID':
+        return density_porosity(inputs[0], params['rho_matrix'], params['rho_fluid'])
+    if curve == 'PHIT':
+        return neutron_density_porosity(*inputs)
+    if curve == 'PHIE':
+        return effective_porosity(*inputs)
+    if curve == 'SW':
+        return archie_sw(*inputs, params['rw'], params['archie_a'], params['archie_m'], params['archie_n'])
+    return pay_flag(*inputs, params['vsh_cutoff'], params['phi_cutoff'], params['sw_cutoff'])
+
+@st.cache_data(show_spinner=False)
+def _compute_stage(curve, stage_inputs, stage_params):
+    """Compute one derived curve for every well in one vectorized pass over their concatenated samples."""
+    params = dict(stage_params)
+    names = list(stage_inputs.keys())
+    lengths = [len(stage_inputs[name][0]) for name in names]
+    inputs = [np.concatenate([stage_inputs[name][i] for name in names])
+              for i in range(len(stage_inputs[names[0]]))]
+
+    if curve == 'VSH':
+        # Default GR endpoints are each well's own P5/P95, repeated over its samples
+        for param, q in (('gr_clean', 5), ('gr_shale', 95)):
+            if params[param] is None:
+                params[param] = np.repeat([np.nanpercentile(stage_inputs[name][0], q) for name in names], lengths)
+
+    values = _compute_curve(curve, inputs, params)
+    return dict(zip(names, np.split(values, np.cumsum(lengths)[:-1])))
+
+def compute_petrophysics(wells, params=None):
+    """Add the derived petrophysical curves to every well.
+
+    Each curve is cached on its own inputs and parameters, so changing one
+    cutoff only recomputes the curves that depend on it. Curves a well
+    already carries are used as inputs rather than recomputed.
+    """
+    params = {**PETRO_DEFAULTS, **(params or {})}
+    curves = {name: {col: df[col].to_numpy(dtype=float) for col in df.columns if col != 'DEPTH'}
+              for name, df in wells.items()}
+    derived = {name: {} for name in wells}
+
+    for curve, (input_curves, param_names) in CURVE_SPECS.items():
+        stage_inputs = {
+            name: tuple(well_curves[col] for col in input_curves)
+            for name, well_curves in curves.items()
+            if curve not in well_curves and all(col in well_curves for col in input_curves)
+        }
+        if not stage_inputs:
+            continue
+
+        stage_params = tuple((param, params[param]) for param in param_names)
+        for name, values in _compute_stage(curve, stage_inputs, stage_params).items():
+            curves[name][curve] = values
+            derived[name][curve] = values
+
+    return {name: df.assign(**derived[name]) for name, df in wells.items()}
+
+def add_petrophysics_curves(df, params=None):
+    """Add the derived petrophysical curves to a single well's DataFrame."""
+    return compute_petrophysics({'well': df}, params)['well']
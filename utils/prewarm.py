@@ -0,0 +1,170 @@
+import streamlit as st
+import pandas as pd
+import io
+import os
+import threading
+import time
+
+from utils.data_loader import open_data_file, prewarm_dataset, get_data_dir, get_sample_data_path, COMPRESSED_EXTENSIONS
+from utils.dataset_registry import data_registry, file_version, register_artifacts, frame_artifacts, registered_datasets, dataset_status
+from utils.schema import DATASET_SCHEMAS
+from utils.time_index import build_time_index
+from utils.well_matrix import build_well_matrix
+
+# Environment variable setting how often, in seconds, the data directory is rescanned; 0 turns the watcher off
+PREWARM_INTERVAL_ENV = 'OG_DASHBOARD_PREWARM_INTERVAL'
+DEFAULT_PREWARM_INTERVAL = 30
+
+# File extensions the watcher looks at
+DATA_EXTENSIONS = ['las', 'csv'] + COMPRESSED_EXTENSIONS
+
+# Bytes read from the start of a file to tell its kind
+CLASSIFY_BYTES = 64 * 1024
+
+def prewarm_interval():
+    """Seconds between data directory scans."""
+    return float(os.environ.get(PREWARM_INTERVAL_ENV, DEFAULT_PREWARM_INTERVAL))
+
+def classify_data_file(file_path):
+    """Tell a well log from a production or drilling CSV by its first line; None if it is neither."""
+    with open_data_file(file_path) as stream:
+        head = stream.read(CLASSIFY_BYTES).decode('utf-8', errors='ignore').lstrip()
+    if head.startswith('~'):
+        return 'well_log'
+    if not head:
+        return None
+
+    try:
+        columns = pd.read_csv(io.StringIO(head.splitlines()[0]), nrows=0).columns
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        return None
+    kinds = [kind for kind, schema in DATASET_SCHEMAS.items()
+             if all(col in columns for col in schema['required'])]
+    # A file with both kinds' required columns goes to the one whose time column it also has
+    timed = [kind for kind in kinds if DATASET_SCHEMAS[kind]['time_column'] in columns]
+    return (timed or kinds or [None])[0]
+
+def scan_data_dir(directory=None):
+    """Bring the registry in line with the data directory.
+
+    New files and files whose size or mtime changed are classified and
+    marked pending; files that disappeared are dropped. Unchanged files
+    are only stat'ed.
+    """
+    directory = directory or get_data_dir()
+    found = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().rsplit('.', 1)[-1] in DATA_EXTENSIONS:
+                path = os.path.join(root, name)
+                try:
+                    found[path] = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    registry = data_registry()
+    registry['scanned'] = time.monotonic()
+    files = registry['files']
+    for path, stat in found.items():
+        entry = files.get(path)
+        if entry is not None and (entry['mtime'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+            continue
+        try:
+            kind = classify_data_file(path)
+        except Exception:
+            kind = None
+        with registry['lock']:
+            files[path] = {'kind': kind, 'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                           'status': 'pending' if kind else 'skipped', 'error': None}
+
+    with registry['lock']:
+        for path in set(files) - set(found):
+            del files[path]
+
+def build_artifacts(kind, df):
+    """Indexes and rollups the pages build on first use of a dataset."""
+    artifacts = {}
+    if kind == 'production' and pd.api.types.is_datetime64_any_dtype(df.get('Date')):
+        group = 'Well_ID' if 'Well_ID' in df.columns else None
+        artifacts[('time_index', 'Date', group)] = build_time_index(df, 'Date', group)
+        if group is not None:
+            artifacts['well_matrix'] = build_well_matrix(df)
+    elif kind == 'drilling' and pd.api.types.is_datetime64_any_dtype(df.get('Timestamp')):
+        artifacts[('time_index', 'Timestamp', None)] = build_time_index(df, 'Timestamp', None)
+    return artifacts
+
+def prewarm_file(file_path):
+    """Hash a pending file, parse it into the shared caches and build its indexes and rollups.
+
+    A file rewritten with the same contents hashes to the same cache key,
+    so its parse and artifacts are found again rather than rebuilt. Only
+    the status is recorded; the frame stays owned by the loader caches.
+    """
+    entry = data_registry()['files'].get(file_path)
+    if entry is None or entry['status'] != 'pending':
+        return
+    started = time.perf_counter()
+    try:
+        file_version(file_path)
+        stat = os.stat(file_path)
+        if (stat.st_mtime_ns, stat.st_size) != (entry['mtime'], entry['size']):
+            # Still being written; the next scan picks up the final version
+            return
+
+        df = prewarm_dataset(entry['kind'], file_path)
+        if frame_artifacts(df) is None:
+            register_artifacts(df, build_artifacts(entry['kind'], df))
+        entry['status'] = 'ready'
+    except Exception as e:
+        entry['status'] = 'failed'
+        entry['error'] = str(e)
+    entry['seconds'] = time.perf_counter() - started
+
+def refresh_datasets():
+    """Scan the data directory and prewarm every new or changed file."""
+    scan_data_dir()
+    files = data_registry()['files']
+    for path in [path for path, entry in list(files.items()) if entry['status'] == 'pending']:
+        prewarm_file(path)
+
+def _watch(interval):
+    """Background loop: refresh the datasets, then sleep for the interval."""
+    while True:
+        try:
+            refresh_datasets()
+        except Exception:
+            # A failed pass (e.g. the directory briefly missing) is retried on the next one
+            pass
+        time.sleep(interval)
+
+@st.cache_resource(show_spinner=False)
+def start_prewarm_watcher():
+    """Start the data directory watcher once per process; None when it is turned off."""
+    interval = prewarm_interval()
+    if interval <= 0:
+        return None
+    thread = threading.Thread(target=_watch, args=(interval,), name='dataset-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+def select_sample_dataset(kind):
+    """Sidebar choice among the data directory's files of one kind, defaulting to the bundled sample.
+
+    The running watcher keeps the file list current; without it the
+    directory is rescanned here at most once per DEFAULT_PREWARM_INTERVAL.
+    """
+    watcher = start_prewarm_watcher()
+    scanned = data_registry()['scanned']
+    if scanned is None or (watcher is None and time.monotonic() - scanned > DEFAULT_PREWARM_INTERVAL):
+        scan_data_dir()
+    default = get_sample_data_path(kind)
+    paths = registered_datasets(kind)
+    if len(paths) <= 1:
+        return paths[0] if paths else default
+
+    base_dir = get_data_dir()
+    path = st.sidebar.selectbox("Sample Dataset", paths, index=paths.index(default) if default in paths else 0,
+                                format_func=lambda path: os.path.relpath(path, base_dir))
+    if watcher is not None and dataset_status(path) == 'pending':
+        st.sidebar.caption("This dataset is still being prepared in the background.")
+    return path
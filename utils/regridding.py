@@ -0,0 +1,101 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+def common_curves(wells):
+    """Return the curves present in every well, in the order of the first well."""
+    frames = list(wells.values())
+    if not frames:
+        return []
+
+    curves = [col for col in frames[0].columns if col != 'DEPTH']
+    for df in frames[1:]:
+        curves = [col for col in curves if col in df.columns]
+    return curves
+
+def build_depth_grid(wells, step=None, depth_range=None, tops=None):
+    """Build a shared depth axis spanning all wells (relative to tops if given)."""
+    mins, maxs, steps = [], [], []
+    for name, df in wells.items():
+        if tops is not None and name not in tops:
+            continue
+        depth = df['DEPTH'].to_numpy(dtype=float)
+        if tops is not None:
+            depth = depth - tops[name]
+        mins.append(np.nanmin(depth))
+        maxs.append(np.nanmax(depth))
+        if len(depth) > 1:
+            steps.append(np.nanmedian(np.abs(np.diff(depth))))
+
+    if step is None:
+        # Default to the finest sampling among the wells
+        step = min(steps) if steps else 1.0
+
+    top = min(mins) if depth_range is None else depth_range[0]
+    base = max(maxs) if depth_range is None else depth_range[1]
+
+    return np.arange(top, base + step / 2, step)
+
+def _interp_curves(depth, values, depth_grid):
+    """Linearly interpolate every column of values onto depth_grid at once."""
+    order = np.argsort(depth, kind='stable')
+    depth = depth[order]
+    values = values[order]
+
+    # Locate each grid depth between two samples once, then reuse for all curves
+    right = np.searchsorted(depth, depth_grid, side='left')
+    right = np.clip(right, 1, len(depth) - 1)
+    left = right - 1
+
+    span = depth[right] - depth[left]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(span > 0, (depth_grid - depth[left]) / span, 0.0)
+
+    weight = weight[:, None]
+    result = values[left] * (1.0 - weight) + values[right] * weight
+
+    # Grid points that land exactly on a sample keep it even next to a null
+    result = np.where(weight == 0.0, values[left], result)
+    result = np.where(weight == 1.0, values[right], result)
+
+    # Grid points outside the logged interval have no data
+    outside = (depth_grid < depth[0]) | (depth_grid > depth[-1])
+    result[outside] = np.nan
+    return result
+
+@st.cache_data
+def regrid_wells(wells, curves, depth_grid, tops=None):
+    """Interpolate curves from many wells onto a common depth grid.
+
+    Returns a dict holding the (well x depth x curve) cube along with its
+    well names, depth axis and curve names.
+    """
+    well_names = list(wells.keys())
+    depth_grid = np.asarray(depth_grid, dtype=float)
+    cube = np.full((len(well_names), len(depth_grid), len(curves)), np.nan)
+
+    for i, name in enumerate(well_names):
+        df = wells[name]
+        if len(df) < 2 or (tops is not None and name not in tops):
+            continue
+
+        depth = df['DEPTH'].to_numpy(dtype=float)
+        if tops is not None:
+            depth = depth - tops[name]
+
+        values = df.reindex(columns=curves).to_numpy(dtype=float)
+        cube[i] = _interp_curves(depth, values, depth_grid)
+
+    return {
+        'wells': well_names,
+        'depth': depth_grid,
+        'curves': list(curves),
+        'values': cube,
+    }
+
+def regridded_well_frame(cube, well):
+    """Return one well of a regridded cube as a DataFrame with a DEPTH column."""
+    i = cube['wells'].index(well)
+    df = pd.DataFrame(cube['values'][i], columns=cube['curves'])
+    df.insert(0, 'DEPTH', cube['depth'])
+    return df
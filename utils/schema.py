@@ -0,0 +1,121 @@
+import pandas as pd
+import numpy as np
+import re
+
+# Rows read to infer a CSV's schema before the full parse
+SNIFF_ROWS = 1000
+
+# Columns each dataset needs, and the column holding its timestamps
+DATASET_SCHEMAS = {
+    'production': {'required': ['Date'], 'time_column': 'Date'},
+    'drilling': {'required': ['Depth'], 'time_column': 'Timestamp'},
+}
+
+# Timestamp formats tried against the sample, most specific first
+TIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+]
+
+# Spreadsheets often save times as minutes:seconds only (e.g. 06:00.0), dropping date and hour
+ELAPSED_FORMAT = 'elapsed'
+_ELAPSED_PATTERN = re.compile(r'^(\d{1,2}):(\d{2}(?:\.\d+)?)$')
+
+# Reconstructed elapsed times count from this instant
+ELAPSED_EPOCH = pd.Timestamp('1970-01-01')
+
+def infer_time_format(values):
+    """Find the timestamp format that parses every sampled value, or ELAPSED_FORMAT for mm:ss.f times."""
+    sample = values.dropna().astype(str).str.strip()
+    if sample.empty:
+        return None
+
+    for time_format in TIME_FORMATS:
+        if pd.to_datetime(sample, format=time_format, errors='coerce').notna().all():
+            return time_format
+
+    if sample.str.match(_ELAPSED_PATTERN).all():
+        return ELAPSED_FORMAT
+
+    raise ValueError(f"Unrecognized timestamp format, e.g. '{sample.iloc[0]}'")
+
+def sniff_csv(sample, dataset):
+    """Infer and validate a dataset's schema from a sample of its rows.
+
+    Returns a plan for the full parse: the column dtypes to pin and the
+    timestamp format, plus notes describing any repair it implies.
+    """
+    schema = DATASET_SCHEMAS[dataset]
+    missing = [col for col in schema['required'] if col not in sample.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    time_column = schema['time_column']
+    numeric = [col for col in sample.columns if col != time_column and pd.api.types.is_numeric_dtype(sample[col])]
+    if not numeric:
+        raise ValueError("No numeric data columns found")
+
+    plan = {
+        'time_column': time_column if time_column in sample.columns else None,
+        'time_format': None,
+        # Pin float columns so the full parse skips type inference; integer columns may hold gaps later
+        'dtypes': {col: 'float64' for col in numeric if pd.api.types.is_float_dtype(sample[col])},
+        'notes': [],
+    }
+
+    if plan['time_column'] is not None:
+        plan['time_format'] = infer_time_format(sample[time_column])
+        if plan['time_format'] == ELAPSED_FORMAT:
+            plan['notes'].append(f"{time_column} values hold only minutes and seconds; they were rebuilt as "
+                                 f"elapsed time from the first row, assuming no gap of an hour or more.")
+    return plan
+
+def _unwrap_elapsed(values, state):
+    """Turn sequential mm:ss.f values into elapsed timestamps, counting an hour each time they wrap."""
+    parts = values.astype(str).str.strip().str.extract(_ELAPSED_PATTERN).astype(float)
+    seconds = parts[0] * 60 + parts[1]
+
+    # Compare each value with the last valid one before it, carrying over from previous chunks
+    previous = seconds.ffill().shift(1)
+    if len(previous):
+        previous.iloc[0] = state.get('last_seconds', np.nan)
+    previous = previous.ffill()
+    hours = state.get('hours', 0) + np.cumsum((seconds < previous).to_numpy())
+
+    valid = seconds.notna().to_numpy()
+    if valid.any():
+        state['last_seconds'] = seconds.to_numpy()[valid][-1]
+    if len(hours):
+        state['hours'] = int(hours[-1])
+
+    return ELAPSED_EPOCH + pd.to_timedelta(hours * 3600 + seconds.to_numpy(), unit='s')
+
+def parse_times(values, time_format=None, state=None):
+    """Parse a timestamp column with a sniffed format.
+
+    Values that do not match are set to NaT and counted in state['bad_times']
+    rather than failing the whole load. Pass the same state for consecutive
+    chunks of one file.
+    """
+    state = {} if state is None else state
+    if time_format == ELAPSED_FORMAT:
+        return pd.Series(_unwrap_elapsed(values, state), index=values.index, name=values.name)
+
+    try:
+        return pd.to_datetime(values, format=time_format)
+    except (ValueError, TypeError):
+        parsed = pd.to_datetime(values, format=time_format, errors='coerce')
+        state['bad_times'] = state.get('bad_times', 0) + int(parsed.isna().sum() - values.isna().sum())
+        return parsed
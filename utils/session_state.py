@@ -11,23 +11,65 @@ def initialize_session_state():
     if 'drilling_data' not in st.session_state:
         st.session_state.drilling_data = None
     
+    if 'multi_well_data' not in st.session_state:
+        st.session_state.multi_well_data = {}
+    
+    if 'derived_columns' not in st.session_state:
+        st.session_state.derived_columns = {'well_log': {}, 'production': {}, 'drilling': {}}
+    
+    if 'derived_values' not in st.session_state:
+        st.session_state.derived_values = {}
+    
+    if 'dataset_versions' not in st.session_state:
+        st.session_state.dataset_versions = {'well_log': 0, 'production': 0, 'drilling': 0}
+        st.session_state.dataset_sources = {'well_log': None, 'production': None, 'drilling': None}
+    
+    if 'drilling_events' not in st.session_state:
+        st.session_state.drilling_events = None
+    
+    if 'time_indexes' not in st.session_state:
+        st.session_state.time_indexes = {}
+    
+    if 'well_matrix' not in st.session_state:
+        st.session_state.well_matrix = None
+    
+    if 'zone_layouts' not in st.session_state:
+        st.session_state.zone_layouts = {}
+    
     if 'selected_well' not in st.session_state:
         st.session_state.selected_well = None
     
     if 'depth_range' not in st.session_state:
         st.session_state.depth_range = None
 
-def set_well_log_data(df):
+def _update_dataset_version(dataset, source):
+    """Bump a dataset's version when it is replaced by data from a different source."""
+    if source is None or st.session_state.dataset_sources[dataset] != source:
+        st.session_state.dataset_versions[dataset] += 1
+        st.session_state.dataset_sources[dataset] = source
+
+def get_dataset_version(dataset):
+    """Get the version number of a dataset in session state."""
+    return st.session_state.dataset_versions[dataset]
+
+def set_well_log_data(df, source=None):
     """Set well log data in session state."""
     st.session_state.well_log_data = df
+    _update_dataset_version('well_log', source)
+
+def set_multi_well_data(wells):
+    """Set the well name to DataFrame mapping used for multi-well views."""
+    st.session_state.multi_well_data = wells
 
-def set_production_data(df):
+def set_production_data(df, source=None):
     """Set production data in session state."""
     st.session_state.production_data = df
+    _update_dataset_version('production', source)
 
-def set_drilling_data(df):
+def set_drilling_data(df, source=None):
     """Set drilling data in session state."""
     st.session_state.drilling_data = df
+    _update_dataset_version('drilling', source)
 
 def set_selected_well(well_name):
     """Set selected well in session state."""
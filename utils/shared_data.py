@@ -0,0 +1,143 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Directory for datasets shared between server processes, e.g. /dev/shm/og_dashboard.
+# Unset disables the shared store and the loaders parse into each process as before.
+SHARED_DIR_ENV = 'OG_DASHBOARD_SHARED_DIR'
+
+def get_shared_dir():
+    """Get the shared dataset directory, or None when the shared store is disabled."""
+    return os.environ.get(SHARED_DIR_ENV) or None
+
+# Schema metadata key carrying the load notes, which Arrow would otherwise drop with df.attrs
+LOAD_NOTES_KEY = b'og_dashboard.load_notes'
+
+def shared_store_enabled():
+    """Check whether datasets should be served from the shared store."""
+    return get_shared_dir() is not None
+
+def _source_prefix(kind, file_path):
+    """File name prefix shared by every version of one source file."""
+    digest = hashlib.sha1(os.path.realpath(file_path).encode()).hexdigest()[:16]
+    return f"{kind}-{digest}-"
+
+def shared_file_path(kind, file_path):
+    """Path of the shared columnar copy of a source file, versioned by its size and mtime."""
+    stat = os.stat(file_path)
+    version = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    return os.path.join(get_shared_dir(), f"{_source_prefix(kind, file_path)}{version}.arrow")
+
+def _frame_to_table(df):
+    """Convert a frame to Arrow, keeping NaN as NaN so numeric columns map back without a copy."""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind in 'fiumM':
+            columns[str(col)] = pa.array(values.to_numpy(), from_pandas=False)
+        else:
+            columns[str(col)] = pa.array(values, from_pandas=True)
+    table = pa.table(columns)
+    return table.replace_schema_metadata({LOAD_NOTES_KEY: json.dumps(df.attrs.get('load_notes', []))})
+
+def publish_frame(df, path):
+    """Write a frame as an uncompressed Arrow IPC file, atomically replacing any existing one."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    table = _frame_to_table(df)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        # Readable by workers running as other users
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            with pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+        # Readers only ever see a complete file; concurrent publishers write identical content
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def remove_stale_versions(path):
+    """Remove older shared copies of the same source; processes still mapping them keep their pages."""
+    directory, name = os.path.split(path)
+    prefix = name[:name.rindex('-') + 1]
+    for other in os.listdir(directory):
+        if other.startswith(prefix) and other.endswith('.arrow') and other != name:
+            try:
+                os.remove(os.path.join(directory, other))
+            except FileNotFoundError:
+                pass
+
+def attach_frame(path):
+    """Memory-map a shared Arrow file as a DataFrame.
+
+    Numeric and datetime columns point straight at the mapped pages, so
+    every process attached to the file shares one physical copy. Those
+    columns are read-only. The load notes published with the file are
+    restored to df.attrs.
+    """
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(split_blocks=True)
+    metadata = table.schema.metadata or {}
+    df.attrs['load_notes'] = json.loads(metadata.get(LOAD_NOTES_KEY, b'[]'))
+    return df
+
+def freeze_frame(df):
+    """Rebuild a frame over read-only views of its own columns, without copying them.
+
+    Writes into the values (df.loc[...] = x, .iloc, .values[...]) raise
+    ValueError, so a frame shared between sessions cannot be changed in place.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy() if df[col].dtype.kind in 'fiumMbO' else df[col].array
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+        columns[col] = values
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.attrs = dict(df.attrs)
+    return frozen
+
+@st.cache_resource(show_spinner=False)
+def _attached_frames():
+    """Process-wide map from each source's file prefix to its attached path and frame."""
+    return {'lock': threading.Lock(), 'frames': {}}
+
+def _attach_cached(path):
+    """Attach a shared file once per process; every session gets the same read-only frame.
+
+    Only the latest version of each source is held. Attaching a new one
+    drops the old frame, and its mapping is released once no session
+    still uses it.
+    """
+    name = os.path.basename(path)
+    prefix = name[:name.rindex('-') + 1]
+    attached = _attached_frames()
+    with attached['lock']:
+        known = attached['frames'].get(prefix)
+        if known is None or known[0] != path:
+            known = attached['frames'][prefix] = (path, freeze_frame(attach_frame(path)))
+        return known[1]
+
+def shared_frame(kind, file_path, parse):
+    """Load a source file through the shared store.
+
+    The first process to see a source version parses it with `parse` and
+    publishes the columnar copy; every other process, including newly
+    started workers, only maps the published file.
+    """
+    path = shared_file_path(kind, file_path)
+    if not os.path.exists(path):
+        publish_frame(parse(file_path), path)
+        remove_stale_versions(path)
+    return _attach_cached(path)
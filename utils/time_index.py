@@ -0,0 +1,167 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.dataset_registry import prebuilt
+
+def build_time_index(df, time_column, group_column=None):
+    """Locate each group's contiguous row range in a frame sorted by group and time.
+
+    The index records, per group, the first row and the end of its
+    non-missing times (missing times sort last). 'sorted' is False when the
+    frame is not in that order, in which case queries fall back to masks.
+    """
+    times = df[time_column].to_numpy()
+    n = len(times)
+    if n == 0:
+        return {'time_column': time_column, 'group_column': group_column, 'sorted': True,
+                'keys': [], 'starts': np.array([], dtype=np.int64), 'stops': np.array([], dtype=np.int64)}
+
+    if group_column is None:
+        starts = np.array([0])
+        keys = [None]
+    else:
+        groups = df[group_column].to_numpy()
+        starts = np.concatenate([[0], np.flatnonzero(groups[1:] != groups[:-1]) + 1])
+        keys = groups[starts].tolist()
+    stops = np.append(starts[1:], n)
+
+    valid = ~np.isnat(times)
+    valid_stops = starts + np.add.reduceat(valid.astype(np.int64), starts)
+
+    # Sorted means every group is one run, missing times trail and valid times never decrease
+    ticks = times.view(np.int64)
+    increasing = np.diff(ticks) >= 0
+    boundary = np.zeros(n - 1, dtype=bool)
+    boundary[starts[1:] - 1] = True
+    is_sorted = (len(set(keys)) == len(keys)
+                 and np.array_equal(valid, np.arange(n) < np.repeat(valid_stops, stops - starts))
+                 and bool(np.all(increasing | boundary | ~valid[1:])))
+
+    return {
+        'time_column': time_column,
+        'group_column': group_column,
+        'sorted': is_sorted,
+        'keys': keys,
+        'starts': starts,
+        'stops': valid_stops,
+    }
+
+def sort_by_time(df, time_column, group_column=None):
+    """Sort a frame by group and time once at load time, leaving sorted frames untouched."""
+    if (time_column not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[time_column])
+            or (group_column is not None and group_column not in df.columns)):
+        return df
+    if build_time_index(df, time_column, group_column)['sorted']:
+        return df
+
+    by = [time_column] if group_column is None else [group_column, time_column]
+    return df.sort_values(by, kind='stable', na_position='last').reset_index(drop=True)
+
+def time_index(df, time_column, group_column, dataset_version):
+    """Time index of a session dataset, built once per dataset version and kept in the session.
+
+    Dataset versions count per session, so the index must not go in a
+    process-wide cache where another session's version could match. An
+    index prebuilt in the background for the same shared frame is reused.
+    """
+    cache = st.session_state.time_indexes
+    key = (time_column, group_column)
+    entry = cache.get(key)
+    if entry is None or entry['version'] != dataset_version or entry['rows'] != len(df):
+        index = prebuilt(df, ('time_index', time_column, group_column))
+        if index is None:
+            index = build_time_index(df, time_column, group_column)
+        entry = cache[key] = {'version': dataset_version, 'rows': len(df), 'index': index}
+    return entry['index']
+
+def filter_time_range(df, time_range, time_column):
+    """Keep the rows whose time lies inside time_range (inclusive), for unsorted frames and chunks."""
+    if not time_range:
+        return df
+    times = df[time_column]
+    return df[(times >= time_range[0]) & (times <= time_range[1])]
+
+def _bisect(ticks, starts, stops, value, side):
+    """Bisect value within every sorted run ticks[start:stop] at once."""
+    lo, hi = starts.copy(), stops.copy()
+    active = lo < hi
+    while active.any():
+        mid = (lo + hi) // 2
+        probe = ticks[np.where(active, mid, 0)]
+        right = active & ((probe < value) if side == 'left' else (probe <= value))
+        lo = np.where(right, mid + 1, lo)
+        hi = np.where(active & ~right, mid, hi)
+        active = lo < hi
+    return lo
+
+def time_window(df, index, time_range=None, groups=None):
+    """Rows inside time_range (inclusive) for the given groups, found by bisection.
+
+    A selection that is one contiguous run of rows comes back as a slice
+    of df without copying. Rows with missing times are only kept when
+    nothing is filtered.
+    """
+    time_column = index['time_column']
+    if groups is not None and set(groups) >= set(index['keys']):
+        groups = None
+    if time_range is None and groups is None:
+        return df
+
+    if not index['sorted']:
+        if groups is not None:
+            df = df[df[index['group_column']].isin(groups)]
+        return filter_time_range(df, time_range, time_column)
+
+    starts, stops = index['starts'], index['stops']
+    if groups is not None:
+        positions = {key: i for i, key in enumerate(index['keys'])}
+        selected = np.array([positions[key] for key in groups if key in positions], dtype=np.int64)
+        starts, stops = starts[selected], stops[selected]
+
+    if time_range is not None:
+        ticks = df[time_column].to_numpy().view(np.int64)
+        starts, stops = (_bisect(ticks, starts, stops, pd.Timestamp(time_range[0]).value, 'left'),
+                         _bisect(ticks, starts, stops, pd.Timestamp(time_range[1]).value, 'right'))
+
+    keep = stops > starts
+    starts, stops = starts[keep], stops[keep]
+    if len(starts) == 1:
+        return df.iloc[starts[0]:stops[0]]
+
+    # Concatenate the runs' row positions without a Python loop
+    lengths = stops - starts
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return df.take(np.arange(lengths.sum()) + offsets)
+
+def time_bounds(df, index):
+    """Earliest and latest time in an indexed frame, or None when it has no times."""
+    times = df[index['time_column']]
+    if not index['sorted']:
+        return None if times.isna().all() else (times.min(), times.max())
+
+    # Sorted groups keep their first and last times at the ends of their runs
+    keep = index['stops'] > index['starts']
+    if not keep.any():
+        return None
+    values = times.to_numpy()
+    return pd.Timestamp(values[index['starts'][keep]].min()), pd.Timestamp(values[index['stops'][keep] - 1].max())
+
+def time_range_slider(label, df, index, step, key=None):
+    """Render a sidebar time-range slider; returns None while the full range is selected."""
+    bounds = time_bounds(df, index)
+    if bounds is None:
+        return None
+
+    # Snap the ends to the step so both are reachable by dragging
+    start, end = bounds[0].floor(step), bounds[1].ceil(step)
+    if start >= end:
+        return None
+
+    value_format = "YYYY-MM-DD HH:mm" if step < pd.Timedelta(days=1) else "YYYY-MM-DD"
+    selected = st.sidebar.slider(label, start.to_pydatetime(), end.to_pydatetime(),
+                                 (start.to_pydatetime(), end.to_pydatetime()),
+                                 step=step.to_pytimedelta(), format=value_format, key=key)
+    if pd.Timestamp(selected[0]) <= start and pd.Timestamp(selected[1]) >= end:
+        return None
+    return pd.Timestamp(selected[0]), pd.Timestamp(selected[1])
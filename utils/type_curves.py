@@ -0,0 +1,97 @@
+import streamlit as st
+import numpy as np
+
+from utils.well_matrix import period_view
+
+# Rate normalizations offered for type curves
+TYPE_CURVE_NORMALIZATIONS = {
+    "None": None,
+    "Peak Month": 'peak',
+    "First Month": 'first',
+}
+
+# Months reported by fewer wells than this are cut from the curve
+MIN_TYPE_CURVE_WELLS = 3
+
+# Well filters whose curves are kept per session
+TYPE_CURVE_CACHE_SIZE = 32
+
+def production_offsets(values, present):
+    """Index of each well's first producing period; wells that never produce get the period count."""
+    producing = present & (values > 0)
+    return np.where(producing.any(axis=1), producing.argmax(axis=1), values.shape[1])
+
+def align_on_production(values, present):
+    """Shift every well's periods so column 0 is its first producing period.
+
+    Periods after a well's history ends are NaN, so they drop out of the
+    percentiles instead of counting as zero production.
+    """
+    n_wells, n_periods = values.shape
+    offsets = production_offsets(values, present)
+    source = offsets[:, None] + np.arange(n_periods)
+    inside = source < n_periods
+    source = np.minimum(source, n_periods - 1)
+
+    rows = np.arange(n_wells)[:, None]
+    keep = inside & present[rows, source]
+    return np.where(keep, values[rows, source], np.nan), offsets
+
+def normalize_rates(aligned, method=None):
+    """Scale each well's aligned rates by its peak or first-month rate."""
+    if method is None:
+        return aligned
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'peak':
+            scale = np.where(np.isnan(aligned), -np.inf, aligned).max(axis=1)
+        else:
+            scale = aligned[:, 0]
+        scale = np.where(scale > 0, scale, np.nan)
+    return aligned / scale[:, None]
+
+def type_curve(aligned, mask, min_wells=MIN_TYPE_CURVE_WELLS):
+    """P10/P50/P90 type curve of the masked wells, one value per month on production.
+
+    Uses the reserves convention (P90 is the low case). Months reported by
+    fewer than min_wells wells, or by every selected well when fewer are
+    selected, are dropped from the end of the curve.
+    """
+    rates = aligned[mask]
+    wells = np.isfinite(rates).sum(axis=0)
+    enough = wells >= min(min_wells, max(int(mask.sum()), 1))
+    months = int(np.argmin(enough)) if not enough.all() else len(enough)
+
+    rates = rates[:, :months]
+    if rates.size == 0:
+        high = mid = low = np.array([])
+    else:
+        high, mid, low = np.nanpercentile(rates, [90, 50, 10], axis=0)
+    return {
+        'months': np.arange(months),
+        'wells': wells[:months],
+        'P10': high,
+        'P50': mid,
+        'P90': low,
+    }
+
+def session_type_curve(matrix, column, mask, normalization=None):
+    """Type curve for a well selection, cached per well filter in the session's well matrix cache.
+
+    The monthly view and each column's aligned matrix are built once per
+    dataset version; toggling wells back to an earlier selection is a lookup.
+    """
+    cache = st.session_state.well_matrix
+    curves = cache.setdefault('type_curves', {'aligned': {}, 'curves': {}})
+
+    if column not in curves['aligned']:
+        if 'monthly' not in curves:
+            curves['monthly'] = period_view(matrix, 'M')
+        monthly = curves['monthly']
+        curves['aligned'][column] = align_on_production(monthly['values'][column], monthly['present'])[0]
+
+    key = (column, normalization, np.packbits(mask).tobytes())
+    if key not in curves['curves']:
+        if len(curves['curves']) >= TYPE_CURVE_CACHE_SIZE:
+            curves['curves'].pop(next(iter(curves['curves'])))
+        curves['curves'][key] = type_curve(normalize_rates(curves['aligned'][column], normalization), mask)
+    return curves['curves'][key]
@@ -27,6 +27,28 @@ def plot_multi_well_log(df, curves, depth_range=None):
     fig.update_yaxes(autorange="reversed")  # Depth increases downward
     return fig
 
+def plot_multi_well_tracks(cube, curves, wells=None, depth_range=None):
+    """Create a correlation panel with one group of tracks per well from a regridded cube."""
+    from utils.regridding import regridded_well_frame
+
+    wells = wells or cube['wells']
+    titles = [f"{well}<br>{curve}" for well in wells for curve in curves]
+    cols = len(wells) * len(curves)
+    # Plotly rejects gaps wider than 1/(cols-1); with many tracks, gaps take at most half the width
+    spacing = min(0.01, 0.5 / (cols - 1)) if cols > 1 else 0.0
+    fig = make_subplots(rows=1, cols=cols, shared_yaxes=True,
+                        subplot_titles=titles, horizontal_spacing=spacing)
+
+    for i, well in enumerate(wells):
+        # Reuse the single-well track layout for each well's slice of the cube
+        well_fig = plot_multi_well_log(regridded_well_frame(cube, well), curves, depth_range)
+        for j, trace in enumerate(well_fig.data):
+            trace.name = f"{well} {curves[j]}"
+            fig.add_trace(trace, row=1, col=i * len(curves) + j + 1)
+
+    fig.update_yaxes(autorange="reversed")  # Depth increases downward
+    return fig
+
 def plot_production_trend(df, y_column, color_column=None):
     """Create a production trend plot."""
     if color_column:
@@ -37,6 +59,38 @@ def plot_production_trend(df, y_column, color_column=None):
     fig.update_layout(hovermode='x unified')
     return fig
 
+def plot_probabilistic_forecast(history_df, y_column, forecast):
+    """Plot historical totals with the P10/P50/P90 forecast bands."""
+    bands = forecast['bands']
+    dates = forecast['dates']
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=history_df['Date'], y=history_df[y_column],
+                             mode='markers', name='Actual Production'))
+    fig.add_trace(go.Scatter(x=dates, y=bands['P10'], mode='lines',
+                             line=dict(width=0), name='P10', showlegend=False))
+    fig.add_trace(go.Scatter(x=dates, y=bands['P90'], mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor='rgba(0, 120, 215, 0.2)', name='P90-P10 Range'))
+    fig.add_trace(go.Scatter(x=dates, y=bands['P50'], mode='lines', name='P50 Forecast'))
+    
+    fig.update_layout(xaxis_title="Date", yaxis_title=y_column, hovermode='x unified')
+    return fig
+
+def plot_type_curve(curve, y_label):
+    """Plot a type curve's P50 line over its P90-P10 band, against months on production."""
+    months = curve['months']
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=curve['P10'], mode='lines',
+                             line=dict(width=0), name='P10', showlegend=False))
+    fig.add_trace(go.Scatter(x=months, y=curve['P90'], mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor='rgba(0, 120, 215, 0.2)', name='P90-P10 Range'))
+    fig.add_trace(go.Scatter(x=months, y=curve['P50'], mode='lines+markers', name='P50 Type Curve',
+                             customdata=curve['wells'], hovertemplate='%{y:.3g} (%{customdata} wells)'))
+    
+    fig.update_layout(xaxis_title="Months on Production", yaxis_title=y_label, hovermode='x unified')
+    return fig
+
 def plot_drilling_kpi(df, parameter, depth_based=True):
     """Create a drilling KPI plot."""
     if depth_based:
@@ -47,6 +101,17 @@ def plot_drilling_kpi(df, parameter, depth_based=True):
     
     return fig
 
+def add_event_markers(fig, events, x_column, y_column, row=None, col=None, showlegend=True):
+    """Overlay drilling event markers on a figure, one trace per event type."""
+    symbols = {'Torque Spike': 'triangle-up', 'Stick-Slip': 'x', 'ROP Drop': 'triangle-down', 'MSE Jump': 'diamond'}
+    
+    for event, group in events.groupby('Event'):
+        fig.add_trace(go.Scatter(x=group[x_column], y=group[y_column], mode='markers', name=event,
+                                 legendgroup=event, showlegend=showlegend,
+                                 marker=dict(symbol=symbols.get(event, 'circle'), size=10, color='crimson')),
+                      row=row, col=col)
+    return fig
+
 def create_kpi_card(title, value, delta=None, unit=""):
     """Create a KPI card with a title, value, and optional delta."""
     if delta is not None:
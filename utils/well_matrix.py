@@ -0,0 +1,161 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.dataset_registry import prebuilt
+
+# Smallest period a well matrix resolves; every resampling frequency is a union of these
+MATRIX_PERIOD = 'D'
+
+def build_well_matrix(df, columns=None):
+    """Lay out long-format production as prefix sums over a (wells x days) grid.
+
+    Timestamps are first binned to MATRIX_PERIOD, so the grid grows with the
+    calendar span rather than with the number of distinct timestamps. For
+    every numeric column the matrix holds cumulative sums along time, with
+    a leading zero column, so the total of any well over any run of days is
+    one subtraction. Row counts are kept the same way to tell which periods
+    a well reports in. Wells are sorted, as groupby sorts them; the Well_ID
+    column itself is never summed, even when numeric.
+    """
+    if columns is None:
+        columns = [col for col in df.select_dtypes('number').columns if col != 'Well_ID']
+
+    valid = (df['Date'].notna() & df['Well_ID'].notna()).to_numpy()
+    well_codes, wells = pd.factorize(df['Well_ID'].to_numpy()[valid], sort=True)
+    days = df['Date'].to_numpy()[valid].astype(f'datetime64[{MATRIX_PERIOD}]')
+    times = np.unique(days)
+    time_codes = np.searchsorted(times, days)
+    cells = well_codes * len(times) + time_codes
+    shape = (len(wells), len(times))
+
+    def prefix(weights=None):
+        grid = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1]).reshape(shape)
+        out = np.zeros((shape[0], shape[1] + 1), dtype=grid.dtype)
+        np.cumsum(grid, axis=1, out=out[:, 1:])
+        return out
+
+    return {
+        'wells': list(wells),
+        'positions': {well: i for i, well in enumerate(wells)},
+        'times': pd.DatetimeIndex(times.astype('datetime64[ns]')),
+        'columns': list(columns),
+        'dtypes': {col: df[col].dtype for col in columns},
+        'prefix': {col: prefix(np.nan_to_num(df[col].to_numpy(dtype=float)[valid])) for col in columns},
+        'counts': prefix(),
+    }
+
+def period_bounds(times, freq, time_range=None):
+    """Bin labels of freq over the timestamps inside time_range, with each bin's [start, end) positions."""
+    start, end = 0, len(times)
+    if time_range is not None:
+        start = times.searchsorted(pd.Timestamp(time_range[0]), side='left')
+        end = times.searchsorted(pd.Timestamp(time_range[1]), side='right')
+    if start >= end:
+        return pd.DatetimeIndex([]), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    counts = pd.Series(1, index=times[start:end]).resample(freq).count()
+    ends = start + np.cumsum(counts.to_numpy())
+    return counts.index, ends - counts.to_numpy(), ends
+
+def period_view(matrix, freq, time_range=None):
+    """Per-well period totals of every column, as dense (wells x periods) arrays.
+
+    'present' marks the periods from each well's first to its last reporting
+    period inside the window, which are the rows a per-well resample keeps.
+    """
+    labels, starts, ends = period_bounds(matrix['times'], freq, time_range)
+    reporting = (matrix['counts'][:, ends] - matrix['counts'][:, starts]) > 0
+
+    # A well is present between its first and last reporting periods
+    n = reporting.shape[1]
+    present = reporting
+    if n:
+        first = np.where(reporting.any(axis=1), reporting.argmax(axis=1), n)
+        last = n - 1 - reporting[:, ::-1].argmax(axis=1)
+        periods = np.arange(n)
+        present = (periods >= first[:, None]) & (periods <= last[:, None])
+
+    return {
+        'labels': labels,
+        'present': present,
+        'values': {col: matrix['prefix'][col][:, ends] - matrix['prefix'][col][:, starts]
+                   for col in matrix['columns']},
+        'cumulative': {col: matrix['prefix'][col][:, ends] - matrix['prefix'][col][:, starts[:1]]
+                       for col in matrix['columns']},
+    }
+
+def well_mask(matrix, wells):
+    """Boolean mask over the matrix rows for a list of wells."""
+    mask = np.zeros(len(matrix['wells']), dtype=bool)
+    mask[[matrix['positions'][well] for well in wells if well in matrix['positions']]] = True
+    return mask
+
+def resampled_frame(matrix, view, mask):
+    """Long-format per-well resample of the masked wells, as resample_production returns it."""
+    keep = view['present'] & mask[:, None]
+    rows, periods = np.nonzero(keep)
+    frame = {
+        'Well_ID': np.asarray(matrix['wells'], dtype=object)[rows],
+        'Date': view['labels'][periods],
+    }
+    for col in matrix['columns']:
+        values = view['values'][col][keep]
+        if pd.api.types.is_integer_dtype(matrix['dtypes'][col]):
+            values = np.rint(values)
+        frame[col] = values.astype(matrix['dtypes'][col])
+    return pd.DataFrame(frame)
+
+def subset_totals(view, column, mask, previous=None):
+    """Field total per period for the masked wells.
+
+    When the totals for a previous mask are passed as (mask, totals), only
+    the wells added or removed since then are summed, so toggling one well
+    costs one row of the matrix.
+    """
+    values = view['values'][column]
+    if previous is not None:
+        old_mask, totals = previous
+        added, removed = mask & ~old_mask, old_mask & ~mask
+        if added.sum() + removed.sum() < mask.sum():
+            return totals + values[added].sum(axis=0) - values[removed].sum(axis=0)
+    return values[mask].sum(axis=0)
+
+def subset_cumulative(view, column, mask):
+    """Cumulative production of the masked wells at the end of each period, from the prefix sums."""
+    return view['cumulative'][column][mask].sum(axis=0)
+
+def session_well_view(df, dataset_version, freq, time_range=None):
+    """Return the session's well matrix and its period view, building each only when its inputs change.
+
+    The matrix is built once per dataset version and the view once per
+    frequency and time range, so a changed well selection reuses both. A
+    matrix prebuilt in the background for the same shared frame is used as is.
+    """
+    cache = st.session_state.well_matrix
+    if cache is None or cache['version'] != dataset_version:
+        matrix = prebuilt(df, 'well_matrix')
+        if matrix is None:
+            matrix = build_well_matrix(df)
+        cache = {'version': dataset_version, 'matrix': matrix, 'view_key': None}
+        st.session_state.well_matrix = cache
+
+    if cache['view_key'] != (freq, time_range):
+        cache['view_key'] = (freq, time_range)
+        cache['view'] = period_view(cache['matrix'], freq, time_range)
+        cache['totals'] = {}
+    return cache['matrix'], cache['view']
+
+def session_field_totals(view, column, mask):
+    """Field production and cumulative production per period for the masked wells.
+
+    Updates the totals of the previous selection in the session's cache
+    rather than summing every selected well again.
+    """
+    cache = st.session_state.well_matrix
+    totals = subset_totals(view, column, mask, cache['totals'].get(column))
+    cache['totals'][column] = (mask, totals)
+
+    field = pd.DataFrame({'Date': view['labels'], column: totals,
+                          f'Cumulative {column}': subset_cumulative(view, column, mask)})
+    return field[view['present'][mask].any(axis=0)].reset_index(drop=True)
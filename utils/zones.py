@@ -0,0 +1,216 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.depth_join import interval_edges
+
+# Columns of a formation tops table; Base is optional and defaults to the next top
+TOPS_COLUMNS = ['Well', 'Zone', 'Top']
+
+def read_tops(file):
+    """Read a formation tops CSV with Well, Zone (or Formation) and Top columns, and optionally Base."""
+    tops = pd.read_csv(file)
+    if 'Zone' not in tops.columns and 'Formation' in tops.columns:
+        tops = tops.rename(columns={'Formation': 'Zone'})
+    return clean_tops(tops)
+
+def clean_tops(tops):
+    """Validate a tops table, dropping incomplete rows and coercing depths to numbers."""
+    missing = [col for col in TOPS_COLUMNS if col not in tops.columns]
+    if missing:
+        raise ValueError(f"Missing tops column(s): {', '.join(missing)}")
+
+    tops = tops.copy()
+    tops['Top'] = pd.to_numeric(tops['Top'], errors='coerce')
+    if 'Base' in tops.columns:
+        tops['Base'] = pd.to_numeric(tops['Base'], errors='coerce')
+    tops = tops.dropna(subset=TOPS_COLUMNS)
+    tops['Well'] = tops['Well'].astype(str)
+    tops['Zone'] = tops['Zone'].astype(str)
+    return tops.reset_index(drop=True)
+
+def build_well_zones(well, zones, top, base=None, base_depth=np.inf):
+    """Zone intervals [top, base) for one well, from its zone names and tops in ascending order.
+
+    A zone without a base ends at the next top, the last one at base_depth.
+    Zones may leave gaps but must not overlap, and no two may share a top.
+    """
+    top = np.asarray(top, dtype=float)
+    following = np.append(top[1:], base_depth)
+    base = following if base is None else np.where(np.isfinite(base), base, following)
+
+    if np.any(top[1:] == top[:-1]):
+        raise ValueError(f"Duplicate top in well {well}")
+    if np.any(base <= top):
+        raise ValueError(f"A zone base is not below its top in well {well}")
+    if np.any(base[:-1] > top[1:]):
+        raise ValueError(f"Zones overlap in well {well}")
+    return {'zones': list(zones), 'tops': top, 'bases': base}
+
+def build_zone_index(tops, base_depths=None):
+    """Zone intervals for every well in a tops table, keyed by well name."""
+    base_depths = base_depths or {}
+    tops = tops.sort_values(['Well', 'Top'], kind='stable')
+    wells = tops['Well'].to_numpy()
+    if len(wells) == 0:
+        return {}
+
+    # Each well's tops are one run of the sorted table
+    starts = np.concatenate([[0], np.flatnonzero(wells[1:] != wells[:-1]) + 1])
+    stops = np.append(starts[1:], len(wells))
+    zones, top = tops['Zone'].to_numpy(), tops['Top'].to_numpy(dtype=float)
+    base = tops['Base'].to_numpy(dtype=float) if 'Base' in tops.columns else None
+
+    return {wells[i]: build_well_zones(wells[i], zones[i:j], top[i:j], None if base is None else base[i:j],
+                                       base_depths.get(wells[i], np.inf))
+            for i, j in zip(starts, stops)}
+
+def zone_at(well_zones, depths):
+    """Position of the zone holding each depth, or -1 outside every zone, by bisection on the tops."""
+    depths = np.asarray(depths, dtype=float)
+    position = np.searchsorted(well_zones['tops'], depths, side='right') - 1
+    inside = (position >= 0) & (depths < well_zones['bases'][np.maximum(position, 0)])
+    return np.where(inside, position, -1)
+
+def zone_bounds(well_zones, depth):
+    """[start, stop) positions of each zone's samples in an ascending depth array."""
+    return (np.searchsorted(depth, well_zones['tops'], side='left'),
+            np.searchsorted(depth, well_zones['bases'], side='left'))
+
+def zone_samples(df, well_zones, zones, depth_column='DEPTH'):
+    """Rows of a log that lie in the named zones, in depth order, with a Zone column."""
+    depth = df[depth_column].to_numpy(dtype=float)
+    order = np.argsort(depth, kind='stable')
+    starts, stops = zone_bounds(well_zones, depth[order])
+    picked = [i for i, zone in enumerate(well_zones['zones']) if zone in zones]
+    if not picked:
+        return df.iloc[:0].assign(Zone=pd.Series(dtype=object))
+
+    rows = order[np.concatenate([np.arange(starts[i], stops[i]) for i in picked])]
+    labels = np.repeat([well_zones['zones'][i] for i in picked], [stops[i] - starts[i] for i in picked])
+    return df.iloc[rows].assign(Zone=labels)
+
+def zone_layout(df, curves, depth_column='DEPTH', net_flag='PAY'):
+    """Prefix sums over a well's depth-sorted samples, so any zone's totals are a few lookups.
+
+    Each distinct depth stands for the interval halfway to its neighbours;
+    gross and net thickness are prefix sums over those intervals, so a zone
+    takes only the part of an interval inside its top and base. Curve sums
+    run over the samples, and curves with gaps also keep prefix counts of
+    their valid samples.
+    """
+    depth = df[depth_column].to_numpy(dtype=float)
+    order = np.argsort(depth, kind='stable')
+    depth = depth[order]
+    finite = np.isfinite(depth)
+
+    def prefix(values):
+        return np.concatenate([[0.0], np.cumsum(values)])
+
+    levels, inverse, counts = np.unique(depth[finite], return_inverse=True, return_counts=True)
+    top, base = interval_edges(levels)
+    thickness = base - top
+    layout = {'depth': depth, 'bottom': levels[-1] if len(levels) else np.nan,
+              'tops': top, 'bases': base, 'thickness': prefix(thickness), 'net': None, 'sums': {}, 'counts': {}}
+    if net_flag in df.columns:
+        # Rows repeating a depth split its interval between them
+        pay = df[net_flag].to_numpy(dtype=float)[order][finite] == 1
+        layout['net'] = prefix(thickness * np.bincount(inverse, weights=pay, minlength=len(levels)) / counts)
+
+    for curve in curves:
+        if curve not in df.columns or curve in (depth_column, net_flag):
+            continue
+        values = df[curve].to_numpy(dtype=float)[order]
+        valid = np.isfinite(values)
+        layout['sums'][curve] = prefix(np.where(valid, values, 0.0))
+        if not valid.all():
+            layout['counts'][curve] = prefix(valid)
+    return layout
+
+def thickness_above(layout, sums, depths):
+    """Part of the prefix-summed thickness lying above each depth, prorating the interval it cuts."""
+    tops, bases = layout['tops'], layout['bases']
+    if len(tops) == 0:
+        return np.zeros(len(depths))
+    # Intervals are contiguous and ascending, so those ending at or above a depth count in full
+    full = np.searchsorted(bases, depths, side='right')
+    cut = np.minimum(full, len(tops) - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.clip((depths - tops[cut]) / (bases[cut] - tops[cut]), 0.0, 1.0)
+    partial = np.where(full < len(tops), (sums[cut + 1] - sums[cut]) * np.nan_to_num(fraction), 0.0)
+    return sums[full] + partial
+
+def layout_statistics(layout, well_zones):
+    """Per-zone sample count, gross and net thickness and curve means, as columns of arrays."""
+    starts, stops = zone_bounds(well_zones, layout['depth'])
+    tops, bases = well_zones['tops'], well_zones['bases']
+    gross = thickness_above(layout, layout['thickness'], bases) - thickness_above(layout, layout['thickness'], tops)
+    stats = {
+        'Zone': well_zones['zones'],
+        'Top': tops,
+        'Base': bases,
+        'Samples': stops - starts,
+        'Gross': gross,
+    }
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if layout['net'] is not None:
+            stats['Net'] = thickness_above(layout, layout['net'], bases) - thickness_above(layout, layout['net'], tops)
+            stats['Net/Gross'] = np.where(gross > 0, stats['Net'] / gross, np.nan)
+
+        for curve, sums in layout['sums'].items():
+            counts = layout['counts'].get(curve)
+            n = stops - starts if counts is None else counts[stops] - counts[starts]
+            stats[f'{curve} Mean'] = (sums[stops] - sums[starts]) / n
+    return stats
+
+def zone_statistics(df, well_zones, curves, depth_column='DEPTH', net_flag='PAY'):
+    """Per-zone curve averages, gross and net thickness of one well, as segment reductions.
+
+    Gross is the logged thickness inside a zone and net the part flagged
+    net_flag == 1.
+    """
+    return pd.DataFrame(layout_statistics(zone_layout(df, curves, depth_column, net_flag), well_zones))
+
+def session_zone_layouts(wells, curves, versions, net_flag='PAY'):
+    """Zone layouts of the session's wells, rebuilt only for wells whose data version or curves changed.
+
+    versions maps each well to a key for everything that shaped its frame
+    (source file, petrophysics parameters, derived columns), since those
+    frames are rebuilt on every rerun.
+    """
+    cache = st.session_state.zone_layouts
+    curves = tuple(curves)
+    for name, df in wells.items():
+        entry = cache.get(name)
+        if (entry is None or entry['version'] != versions[name] or entry['curves'] != curves
+                or entry['net_flag'] != net_flag):
+            cache[name] = {'version': versions[name], 'curves': curves, 'net_flag': net_flag,
+                           'layout': zone_layout(df, curves, net_flag=net_flag)}
+    for name in set(cache) - set(wells):
+        del cache[name]
+    return {name: entry['layout'] for name, entry in cache.items()}
+
+def zonal_summary(wells, tops, curves, versions, net_flag='PAY'):
+    """Zone statistics for every well named in the tops table, one row per well and zone.
+
+    Well layouts are kept in the session per data version, so editing tops
+    or switching zones only repeats the per-zone lookups, not a pass over
+    the samples.
+    """
+    layouts = session_zone_layouts(wells, curves, versions, net_flag)
+
+    # The last zone of a well runs to the base of its deepest sample's interval
+    base_depths = {name: max(np.nextafter(layout['bottom'], np.inf), layout['bases'][-1])
+                   for name, layout in layouts.items() if np.isfinite(layout['bottom'])}
+    frames = []
+    for well, well_zones in build_zone_index(tops, base_depths).items():
+        if well in layouts:
+            frames.append({'Well': [well] * len(well_zones['zones']), **layout_statistics(layouts[well], well_zones)})
+    if not frames:
+        return pd.DataFrame()
+
+    columns = list(dict.fromkeys(col for frame in frames for col in frame))
+    return pd.DataFrame({col: np.concatenate([np.asarray(frame[col]) if col in frame
+                                              else np.full(len(frame['Zone']), np.nan) for frame in frames])
+                         for col in columns})